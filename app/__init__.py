@@ -3,14 +3,14 @@ Bank Data API Application
 A Flask application implementing the Bank Data API specification for data exchange between banks and SRC.
 """
 
-from flask import Flask, request
+from flask import Flask, request, g
 from flask_cors import CORS
 import os
 
 def create_app():
     """Create and configure the Flask application."""
     # Set up logging first
-    from app.config import setup_logging, get_logger, Config
+    from app.config import setup_logging, get_logger, get_config
     setup_logging()
 
     logger = get_logger('main')
@@ -21,12 +21,19 @@ def create_app():
 
     # Enable CORS for all routes
     CORS(app)
+    
+    # Requests under /banks/<bank_id>/ are served by that bank (see app.services.bank_registry)
+    @app.url_value_preprocessor
+    def pull_bank_id(endpoint, values):
+        g.bank_id = values.pop('bank_id', None) if values else None
 
     # Set Flask configuration from our config
-    config = Config()
+    config = get_config()
     app.config['DEBUG'] = config.DEBUG
 
     logger.info(f"Application configured - Debug: {config.DEBUG}")
+    logger.info(f"Rate limiting configured: {config.RATE_LIMIT_MAX_REQUESTS} requests per "
+                f"{config.RATE_LIMIT_WINDOW_SECONDS} seconds")
 
     # Add request logging middleware for DEBUG level
     if config.LOG_LEVEL == 'DEBUG':
@@ -67,7 +74,33 @@ def create_app():
 
         logger.info("Debug request logging enabled")
     
-    # Register blueprints
+    # Contract checking: the spec is compiled once here, requests are always checked, responses are sampled
+    if config.CONTRACT_VALIDATION_ENABLED:
+        from app.services.contract_validator import get_contract_validator
+        contract_validator = get_contract_validator()
+        
+        def spec_path():
+            # Multi-bank requests are checked against the spec path without the /banks/<bank_id> prefix
+            path = request.path
+            if path.startswith('/banks/'):
+                path = '/' + path.split('/', 3)[3] if path.count('/') >= 3 else path
+            return path
+        
+        @app.before_request
+        def check_request_contract():
+            contract_validator.check_request(request.method, spec_path(), request.headers)
+        
+        @app.after_request
+        def check_response_contract(response):
+            # Streamed responses (send_file) cannot be read back here and no spec operation returns one
+            if not response.direct_passthrough and contract_validator.should_sample_response():
+                contract_validator.check_response(
+                    request.method, spec_path(), response.status_code, response.get_data, response.is_json
+                )
+            return response
+        
+        logger.info("Contract validation enabled")
+    
     from app.routes.core_routes import core_bp
     from app.routes.support_routes import support_bp
     from app.routes.spec_routes import spec_bp
@@ -76,7 +109,50 @@ def create_app():
     app.register_blueprint(support_bp)
     app.register_blueprint(spec_bp)
     
+    # Multi-bank mode: the same API under a per-bank path prefix
+    app.register_blueprint(core_bp, url_prefix='/banks/<bank_id>', name='bank_core')
+    app.register_blueprint(support_bp, url_prefix='/banks/<bank_id>', name='bank_support')
+    
+    if config.ADMIN_API_ENABLED:
+        from app.routes.admin_routes import admin_bp
+        app.register_blueprint(admin_bp)
+        logger.info("Admin API enabled at /admin/")
+    
     logger.info("All blueprints registered successfully")
+    
+    # Hot reload: rebuild config and datasets when the watched files change
+    if config.RELOAD_WATCH_SECONDS > 0:
+        from app.services.reloader import get_reloader
+        get_reloader().start_watching()
+    
+    # Heap inspector: trace allocations from startup so snapshots cover everything created afterwards
+    if config.HEAP_INSPECTOR_ENABLED:
+        from app.services.heap_inspector import get_heap_inspector
+        from app.services.bank_registry import get_bank_registry
+        from app.routes.support_routes import rate_limit_store_size
+        
+        heap_inspector = get_heap_inspector()
+        heap_inspector.register_gauge('rate_limit_store', rate_limit_store_size)
+        heap_inspector.register_gauge('sessions_by_bank', lambda: {
+            bank_id: bank.session_manager.status_counts()['total']
+            for bank_id, bank in get_bank_registry().banks().items()
+        })
+    
+    # Warm restart: restore sessions from the last snapshot and re-arm pending consent
+    if config.SNAPSHOT_FILE:
+        from app.services.snapshot_service import get_snapshot_service
+        from app.services.admission_controller import get_admission_controller
+        from app.routes.core_routes import simulate_consent_process
+        from app.routes.support_routes import export_rate_limit_state, restore_rate_limit_state
+        
+        def resume_consent(bank, session):
+            get_admission_controller().admit(force=True)
+            simulate_consent_process(bank, session.session_id, session.psn)
+        
+        snapshot_service = get_snapshot_service()
+        snapshot_service.register_source('rate_limits', export_rate_limit_state, restore_rate_limit_state)
+        snapshot_service.restore(on_pending=resume_consent)
+        snapshot_service.start()
     logger.info("Redoc documentation available at /docs/")
     
     return app
\ No newline at end of file
@@ -6,43 +6,175 @@ Handles logging configuration and application settings
 import os
 import logging
 import logging.config
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Generic, Mapping, Optional, TypeVar
+import threading
+
+# The process environment as started, before .env is merged in; a reload layers it over a fresh read of .env
+_PROCESS_ENV = dict(os.environ)
 
 # Load environment variables from .env file
 try:
     from dotenv import load_dotenv
-    load_dotenv()  # This loads variables from .env file into os.environ
+    load_dotenv()  # This loads variables from .env file into os.environ (existing variables win)
 except ImportError:
     # python-dotenv not installed, will use system environment variables only
     pass
 
 
 class Config:
-    """Application configuration class"""
-    
-    # Server configuration
-    PORT = int(os.environ.get('PORT', 8080))
-    HOST = os.environ.get('HOST', '0.0.0.0')
-    DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() in ['true', '1', 'yes']
-    
-    # Logging configuration
-    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
-    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'detailed')  # 'simple', 'detailed', 'json'
-    LOG_FILE = os.environ.get('LOG_FILE', None)  # Optional log file path
+    """Application configuration class, read from the environment and frozen after construction"""
     
-    # Session configuration
-    SESSION_TTL_MINUTES = int(os.environ.get('SESSION_TTL_MINUTES', 30))
+    def __init__(self, environ: Optional[Mapping[str, str]] = None):
+        """Parse settings from environ (defaults to os.environ)"""
+        env = os.environ if environ is None else environ
+        
+        # Server configuration
+        self.PORT = int(env.get('PORT', 8080))
+        self.HOST = env.get('HOST', '0.0.0.0')
+        self.DEBUG = env.get('FLASK_DEBUG', 'False').lower() in ['true', '1', 'yes']
+        
+        # Logging configuration
+        self.LOG_LEVEL = env.get('LOG_LEVEL', 'INFO').upper()
+        self.LOG_FORMAT = env.get('LOG_FORMAT', 'detailed')  # 'simple', 'detailed', 'json'
+        self.LOG_FILE = env.get('LOG_FILE', None)  # Optional log file path
+        
+        # Session configuration
+        self.SESSION_TTL_MINUTES = int(env.get('SESSION_TTL_MINUTES', 30))
+        self.SESSION_INDEX_BUCKET_SECONDS = int(env.get('SESSION_INDEX_BUCKET_SECONDS', 60))  # Creation-time index granularity
+        
+        # Rate limiting configuration
+        self.RATE_LIMIT_WINDOW_SECONDS = int(env.get('RATE_LIMIT_WINDOW_SECONDS', 60))
+        self.RATE_LIMIT_MAX_REQUESTS = int(env.get('RATE_LIMIT_MAX_REQUESTS', 10))
+        
+        # Clock configuration
+        self.CLOCK_MODE = env.get('CLOCK_MODE', 'system').lower()  # 'system', 'virtual'
+        self.CLOCK_SPEED = float(env.get('CLOCK_SPEED', 1.0))  # Virtual clock speed multiplier, 0 = manual only
+        
+        # Consent processing configuration
+        self.CONSENT_WORKER_THREADS = int(env.get('CONSENT_WORKER_THREADS', 4))
+        
+        # Multi-bank configuration
+        self.BANKS_CONFIG_FILE = env.get('BANKS_CONFIG_FILE', None)  # Optional JSON file describing additional banks
+        
+        # Bank data backend ('' = in-memory mock data only, 'http', 'sqlite')
+        self.BANK_BACKEND = env.get('BANK_BACKEND', '').lower()
+        self.BANK_BACKEND_URL = env.get('BANK_BACKEND_URL', '')  # URL template with {psn} for http, file path for sqlite
+        self.BANK_BACKEND_POOL_SIZE = int(env.get('BANK_BACKEND_POOL_SIZE', 8))
+        self.BANK_BACKEND_TIMEOUT_SECONDS = float(env.get('BANK_BACKEND_TIMEOUT_SECONDS', 2))
+        self.BANK_BACKEND_CACHE_TTL_SECONDS = float(env.get('BANK_BACKEND_CACHE_TTL_SECONDS', 60))
+        self.BANK_BACKEND_CACHE_MAX_ENTRIES = int(env.get('BANK_BACKEND_CACHE_MAX_ENTRIES', 10000))
+        self.BANK_BACKEND_FAILURE_THRESHOLD = int(env.get('BANK_BACKEND_FAILURE_THRESHOLD', 5))  # Failures before the circuit opens
+        self.BANK_BACKEND_RESET_SECONDS = float(env.get('BANK_BACKEND_RESET_SECONDS', 30))  # Open circuit cool-down
+        
+        # Idempotency configuration (deduplicates retried data requests by X-Request-ID + PSN)
+        self.IDEMPOTENCY_ENABLED = env.get('IDEMPOTENCY_ENABLED', 'False').lower() in ['true', '1', 'yes']
+        self.IDEMPOTENCY_TTL_SECONDS = float(env.get('IDEMPOTENCY_TTL_SECONDS', 60))
+        self.IDEMPOTENCY_MAX_ENTRIES = int(env.get('IDEMPOTENCY_MAX_ENTRIES', 10000))
+        
+        # Mock dataset configuration
+        self.MOCK_DATA_FILE = env.get('MOCK_DATA_FILE', None)  # Optional CSV of additional citizens
+        self.PSN_FILTER_FP_RATE = float(env.get('PSN_FILTER_FP_RATE', 0))  # Bloom filter false-positive rate, 0 = off
+        
+        # Contract validation against bank_data_api.yaml
+        self.CONTRACT_VALIDATION_ENABLED = env.get('CONTRACT_VALIDATION_ENABLED', 'False').lower() in ['true', '1', 'yes']
+        self.CONTRACT_RESPONSE_SAMPLE_RATE = float(env.get('CONTRACT_RESPONSE_SAMPLE_RATE', 0.01))  # Share of responses checked
+        
+        # Admission control for session creation (0 = unlimited)
+        self.ADMISSION_MAX_PENDING = int(env.get('ADMISSION_MAX_PENDING', 0))  # In-flight consent processes
+        self.ADMISSION_TARGET_LATENCY_MS = float(env.get('ADMISSION_TARGET_LATENCY_MS', 0))  # Adaptive limit target, 0 = static
+        self.ADMISSION_RETRY_AFTER_SECONDS = int(env.get('ADMISSION_RETRY_AFTER_SECONDS', 1))
+        
+        # Session snapshot configuration
+        self.SNAPSHOT_FILE = env.get('SNAPSHOT_FILE', None)  # Optional snapshot path, enables warm restart
+        self.SNAPSHOT_INTERVAL_SECONDS = float(env.get('SNAPSHOT_INTERVAL_SECONDS', 5))
+        self.SNAPSHOT_COMPACT_EVERY = int(env.get('SNAPSHOT_COMPACT_EVERY', 50))  # Delta frames before a full rewrite
+        
+        # Audit log configuration
+        self.AUDIT_LOG_DIR = env.get('AUDIT_LOG_DIR', None)  # Optional directory, enables the session audit log
+        self.AUDIT_LOG_SEGMENT_MB = float(env.get('AUDIT_LOG_SEGMENT_MB', 64))  # Segment size before rotation
+        self.AUDIT_LOG_BATCH_MAX = int(env.get('AUDIT_LOG_BATCH_MAX', 512))  # Events per group commit
+        self.AUDIT_LOG_FLUSH_MS = float(env.get('AUDIT_LOG_FLUSH_MS', 50))  # Max wait to fill a group commit
+        
+        # Cluster configuration (see run_router.py)
+        self.NODE_ID = env.get('NODE_ID', None)  # Node name stamped into session IDs when running behind the router
+        self.ROUTER_PORT = int(env.get('ROUTER_PORT', 8000))
+        self.ROUTER_BACKENDS = env.get('ROUTER_BACKENDS', '')  # Comma-separated name=url pairs
+        self.ROUTER_VNODES = int(env.get('ROUTER_VNODES', 100))  # Ring points per backend
+        self.ROUTER_POOL_SIZE = int(env.get('ROUTER_POOL_SIZE', 32))  # Keep-alive connections per backend
+        self.ROUTER_TIMEOUT_SECONDS = float(env.get('ROUTER_TIMEOUT_SECONDS', 10))
+        self.ROUTER_HEALTH_INTERVAL_SECONDS = float(env.get('ROUTER_HEALTH_INTERVAL_SECONDS', 2))
+        self.ROUTER_HEALTH_PATH = env.get('ROUTER_HEALTH_PATH', '/health')
+        self.ROUTER_WORKERS = int(env.get('ROUTER_WORKERS', 1))  # Router processes sharing the port
+        
+        # Heap inspector configuration (served under /admin/heap)
+        self.HEAP_INSPECTOR_ENABLED = env.get('HEAP_INSPECTOR_ENABLED', 'False').lower() in ['true', '1', 'yes']
+        self.HEAP_TRACE_FRAMES = int(env.get('HEAP_TRACE_FRAMES', 10))  # tracemalloc traceback depth
+        self.HEAP_RSS_SAMPLE_SECONDS = float(env.get('HEAP_RSS_SAMPLE_SECONDS', 10))
+        self.HEAP_RSS_HISTORY = int(env.get('HEAP_RSS_HISTORY', 360))  # RSS samples kept
+        
+        # Hot reload configuration (POST /admin/reload is always available with the admin API)
+        self.RELOAD_WATCH_SECONDS = float(env.get('RELOAD_WATCH_SECONDS', 0))  # File-watch poll interval, 0 = off
+        
+        # Admin API configuration
+        self.ADMIN_API_ENABLED = env.get('ADMIN_API_ENABLED', 'False').lower() in ['true', '1', 'yes']
+        
+        self._frozen = True
     
-    # Rate limiting configuration
-    RATE_LIMIT_WINDOW_SECONDS = int(os.environ.get('RATE_LIMIT_WINDOW_SECONDS', 60))
-    RATE_LIMIT_MAX_REQUESTS = int(os.environ.get('RATE_LIMIT_MAX_REQUESTS', 10))
+    def __setattr__(self, name: str, value: Any):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"Config is frozen, cannot set {name}")
+        super().__setattr__(name, value)
+
+
+_config: Optional[Config] = None
 
 
+def get_config() -> Config:
+    """
+    Get the application configuration, parsed once on first use
+    """
+    global _config
+    if _config is None:
+        _config = Config()
+    return _config
+
+
+def env_file_path() -> Optional[str]:
+    """Path of the .env file the configuration is read from, if there is one"""
+    try:
+        from dotenv import find_dotenv
+        return find_dotenv() or None
+    except ImportError:
+        return None
+
+
+def load_config() -> Config:
+    """
+    Parse a fresh Config from the current .env and the process environment, with the same precedence
+    as at startup: process variables win over .env, and keys removed from .env fall back to their defaults.
+    The active configuration is unchanged until the result is passed to swap_config().
+    """
+    try:
+        from dotenv import dotenv_values
+    except ImportError:
+        return Config(_PROCESS_ENV)
+    path = env_file_path()
+    environ = {key: value for key, value in dotenv_values(path).items() if value is not None} if path else {}
+    environ.update(_PROCESS_ENV)
+    return Config(environ)
+
+
+def swap_config(config: Config) -> Config:
+    """Make config the active configuration and return the previous one (a single reference swap)"""
+    global _config
+    previous, _config = _config, config
+    return previous
+
 def get_logging_config() -> Dict[str, Any]:
     """
     Get logging configuration dictionary based on environment settings
     """
-    config = Config()
+    config = get_config()
     
     # Define format strings
     formats = {
@@ -123,7 +255,7 @@ def setup_logging():
         
         # Log the configuration being used
         logger = logging.getLogger('app.config')
-        app_config = Config()
+        app_config = get_config()
         
         logger.info("="*60)
         logger.info("Bank Data API - Logging Configuration")
@@ -174,4 +306,45 @@ def get_logger(name: str) -> logging.Logger:
         app_logger.setLevel(logging.INFO)
         app_logger.propagate = False
     
-    return logger
\ No newline at end of file
+    return logger
+
+
+T = TypeVar('T')
+
+
+class LazySingleton(Generic[T]):
+    """
+    Shared instance created by factory() on the first call, so that importing a module
+    does not construct its service. Thread-safe; reset() drops the instance.
+    """
+    
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._created = False
+        self._lock = threading.Lock()
+    
+    def __call__(self) -> T:
+        if not self._created:
+            with self._lock:
+                if not self._created:
+                    self._instance = self._factory()
+                    self._created = True
+        return self._instance
+    
+    @property
+    def initialized(self) -> bool:
+        return self._created
+    
+    def reset(self):
+        with self._lock:
+            self._instance = None
+            self._created = False
+    
+    def swap(self, instance: T) -> Optional[T]:
+        """Replace the shared instance; callers that already hold the old one keep using it"""
+        with self._lock:
+            previous = self._instance
+            self._instance = instance
+            self._created = True
+            return previous
\ No newline at end of file
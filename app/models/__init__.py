@@ -55,6 +55,7 @@ class Session:
     created_at: datetime
     expires_at: Optional[datetime]
     data: Optional[BankData] = None
+    request_id: Optional[str] = None  # X-Request-ID of the request that created the session
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
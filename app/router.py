@@ -0,0 +1,269 @@
+"""
+Cluster router for the Bank Data API
+Spreads requests over several app instances: /citizen/<psn>/... by consistent hash of the PSN and
+/request/<session_id> by the owner node tagged into the session ID (see app.services.hash_ring)
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from app.config import get_logger
+from app.services.bank_data_backend import BackendUnavailableError, ConnectionPool, STALE_CONNECTION_ERRORS
+from app.services.hash_ring import HashRing, node_tag, session_owner_tag
+import http.client
+import itertools
+import json
+import threading
+import time
+
+logger = get_logger('router')
+
+# Headers that describe a single connection and must not be forwarded
+_HOP_BY_HOP = {'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te', 'trailer',
+               'transfer-encoding', 'upgrade'}
+
+# Methods safe to resend: a stale-connection error may come after the backend already handled the request
+_IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'}
+
+
+def parse_backends(spec: str) -> Dict[str, str]:
+    """Parse 'name=url,name=url' (e.g. node-1=http://127.0.0.1:8081) into {name: url}"""
+    backends = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, sep, url = item.partition('=')
+        if not sep or not name or not url:
+            raise ValueError(f"Invalid backend '{item}', expected name=url")
+        backends[name.strip()] = url.strip().rstrip('/')
+    return backends
+
+
+class Backend:
+    """One app instance behind the router"""
+
+    def __init__(self, name: str, url: str, pool_size: int, timeout_seconds: float):
+        parts = urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise ValueError(f"Backend URL for {name} must be http://host:port, got {url}")
+        self.name = name
+        self.url = url
+        self.tag = node_tag(name)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.healthy = True
+        self.pool = ConnectionPool(
+            lambda: http.client.HTTPConnection(self.host, self.port, timeout=timeout_seconds),
+            pool_size,
+            timeout_seconds
+        )
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._total_seconds = 0.0
+
+    def record(self, elapsed: float, error: bool):
+        with self._lock:
+            self._requests += 1
+            self._total_seconds += elapsed
+            if error:
+                self._errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'url': self.url,
+                'tag': self.tag,
+                'healthy': self.healthy,
+                'requests': self._requests,
+                'errors': self._errors,
+                'avg_ms': round(self._total_seconds / self._requests * 1000, 3) if self._requests else 0.0,
+                'pool': self.pool.stats()
+            }
+
+
+class Router:
+    """Chooses the backend for a request and forwards it over pooled keep-alive connections"""
+
+    def __init__(self, backends: Dict[str, str], vnodes: int = 100, pool_size: int = 32,
+                 timeout_seconds: float = 10.0, health_path: str = '/health'):
+        """Set up pools and the hash ring; raises ValueError for an empty or ambiguous backend list"""
+        if not backends:
+            raise ValueError("No backends configured, set ROUTER_BACKENDS")
+        self._backends = {name: Backend(name, url, pool_size, timeout_seconds) for name, url in backends.items()}
+        self._by_tag = {backend.tag: backend for backend in self._backends.values()}
+        if len(self._by_tag) != len(self._backends):
+            raise ValueError("Two backend names hash to the same session tag, rename one of them")
+        self._ring = HashRing(self._backends, vnodes)
+        self._round_robin = itertools.cycle(list(self._backends.values()))
+        self._health_path = health_path
+        self._health_timeout = min(timeout_seconds, 2.0)
+        self._stop = threading.Event()
+
+    def is_healthy(self, name: str) -> bool:
+        return self._backends[name].healthy
+
+    def route(self, path: str, explicit_node: Optional[str] = None) -> Optional[Backend]:
+        """
+        Pick the backend for a request path (query string excluded).
+        Session lookups go to the node that created the session, PSN requests to the PSN's place on the
+        ring (skipping unhealthy nodes), and everything else round-robin. X-Route-Node overrides all of it.
+        """
+        if explicit_node:
+            return self._backends.get(explicit_node)
+
+        segments = [segment for segment in path.split('/') if segment]
+        if len(segments) >= 2 and segments[0] == 'banks':
+            segments = segments[2:]  # /banks/<bank_id>/... routes like the unprefixed path
+
+        if len(segments) == 2 and segments[0] == 'request':
+            return self._owner(segments[1])
+        if len(segments) >= 2 and segments[0] == 'citizen':
+            if len(segments) == 4:
+                owner = self._by_tag.get(session_owner_tag(segments[3]) or '')
+                if owner is not None:
+                    return owner
+            name = self._ring.lookup(segments[1], accept=self.is_healthy)
+            return self._backends[name] if name else None
+
+        for _ in range(len(self._backends)):
+            backend = next(self._round_robin)
+            if backend.healthy:
+                return backend
+        return None
+
+    def _owner(self, session_id: str) -> Optional[Backend]:
+        owner = self._by_tag.get(session_owner_tag(session_id) or '')
+        if owner is not None:
+            return owner
+        # Untagged or foreign session ID: any node answers it consistently with 404
+        name = self._ring.lookup(session_id, accept=self.is_healthy)
+        return self._backends[name] if name else None
+
+    def forward(self, backend: Backend, method: str, path: str, headers: List[Tuple[str, str]],
+                body: Optional[bytes]) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """
+        Send a request to a backend and return (status, headers, body).
+        An idempotent request that fails on a stale keep-alive connection is retried once on a fresh one;
+        others (e.g. POST /admin/reload) are not, since the backend may already have run them.
+        Raises BackendUnavailableError when the backend cannot be reached.
+        """
+        started = time.perf_counter()
+        try:
+            for attempt in range(2):
+                try:
+                    with backend.pool.connection() as conn:
+                        conn.request(method, path, body=body, headers=dict(headers))
+                        response = conn.getresponse()
+                        data = response.read()
+                        if response.will_close:
+                            conn.close()  # Reconnects transparently on next use
+                    break
+                except STALE_CONNECTION_ERRORS:
+                    backend.pool.close()  # Idle connections from before a backend restart are all stale
+                    if attempt or method not in _IDEMPOTENT_METHODS:
+                        raise
+        except (OSError, http.client.HTTPException) as e:
+            backend.record(time.perf_counter() - started, error=True)
+            if backend.healthy:
+                logger.warning(f"Backend {backend.name} failed, marking unhealthy: {e}")
+            backend.healthy = False
+            raise BackendUnavailableError(f"Backend {backend.name} unavailable: {e}") from e
+
+        backend.record(time.perf_counter() - started, error=False)
+        response_headers = [(name, value) for name, value in response.getheaders()
+                            if name.lower() not in _HOP_BY_HOP and name.lower() != 'content-length']
+        return response.status, response_headers, data
+
+    def check_health(self):
+        """Probe every backend once on a dedicated short-timeout connection"""
+        for backend in self._backends.values():
+            conn = http.client.HTTPConnection(backend.host, backend.port, timeout=self._health_timeout)
+            try:
+                conn.request('GET', self._health_path)
+                healthy = conn.getresponse().status < 500
+            except (OSError, http.client.HTTPException):
+                healthy = False
+            finally:
+                conn.close()
+            if healthy != backend.healthy:
+                logger.info(f"Backend {backend.name} is now {'healthy' if healthy else 'unhealthy'}")
+            backend.healthy = healthy
+
+    def start_health_checks(self, interval_seconds: float):
+        """Run check_health every interval_seconds on a daemon thread"""
+        def run():
+            while not self._stop.wait(interval_seconds):
+                self.check_health()
+
+        self.check_health()
+        threading.Thread(target=run, name='router-health', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        for backend in self._backends.values():
+            backend.pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backends': {name: backend.stats() for name, backend in self._backends.items()}}
+
+
+class _RouterHandler(BaseHTTPRequestHandler):
+    """Proxies every request to the backend chosen by the router"""
+
+    protocol_version = 'HTTP/1.1'  # Keep client connections alive too
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+    router: Router = None
+
+    def _proxy(self):
+        path = urlsplit(self.path).path
+        if path == '/router/status':
+            self._send(200, [('Content-Type', 'application/json')], json.dumps(self.router.stats()).encode())
+            return
+
+        backend = self.router.route(path, self.headers.get('X-Route-Node'))
+        if backend is None or not backend.healthy:
+            name = backend.name if backend else 'any'
+            self._send_error(503, f"No healthy backend available ({name})")
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        headers = [(name, value) for name, value in self.headers.items() if name.lower() not in _HOP_BY_HOP]
+        headers.append(('X-Forwarded-For', self.client_address[0]))
+
+        try:
+            status, response_headers, data = self.router.forward(backend, self.command, self.path, headers, body)
+        except BackendUnavailableError as e:
+            self._send_error(502, str(e))
+            return
+        response_headers.append(('X-Served-By', backend.name))
+        self._send(status, response_headers, data)
+
+    def _send(self, status: int, headers: List[Tuple[str, str]], body: bytes):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str):
+        self._send(status, [('Content-Type', 'application/json'), ('Retry-After', '1')],
+                   json.dumps({"error": message}).encode())
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = do_OPTIONS = _proxy
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class RouterServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def create_server(router: Router, host: str, port: int, reuse_port: bool = False) -> RouterServer:
+    """HTTP server for the router; reuse_port lets several router processes share the port (Linux/BSD)"""
+    handler = type('RouterHandler', (_RouterHandler,), {'router': router})
+    server_class = type('SharedPortRouterServer', (RouterServer,), {'allow_reuse_port': True}) \
+        if reuse_port else RouterServer
+    return server_class((host, port), handler)
@@ -0,0 +1,223 @@
+"""
+Admin API routes for the Bank Data API
+Operational endpoints for test harnesses; only registered when ADMIN_API_ENABLED is set
+"""
+
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify
+from app.models import SessionStatus
+from app.services.clock import get_clock
+from app.services.idempotency_cache import get_idempotency_cache
+from app.services.bank_registry import get_bank_registry
+from app.services.contract_validator import get_contract_validator
+from app.services.admission_controller import get_admission_controller
+from app.services.audit_log import get_audit_log
+from app.services.heap_inspector import get_heap_inspector
+from app.services.reloader import get_reloader
+from app.config import get_logger
+
+logger = get_logger('routes.admin')
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+@admin_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Report counters from the optional performance features"""
+    idempotency_cache = get_idempotency_cache()
+    contract_validator = get_contract_validator()
+    audit_log = get_audit_log()
+    metrics = {
+        'idempotency': idempotency_cache.stats() if idempotency_cache is not None else None,
+        'contract': contract_validator.stats() if contract_validator is not None else None,
+        'admission': get_admission_controller().stats(),
+        'audit': audit_log.stats() if audit_log is not None else None,
+        'banks': {
+            bank_id: {
+                'psn_filter': bank.data_service.psn_filter_stats(),
+                'backend': bank.data_service.backend_stats()
+            }
+            for bank_id, bank in get_bank_registry().banks().items()
+        }
+    }
+    return jsonify(metrics), 200
+
+
+@admin_bp.route('/sessions', methods=['GET'])
+def list_sessions():
+    """
+    Session counts and a cursor-paginated listing for one bank.
+    Query parameters: bank (default bank when omitted), status, created_after / created_before (ISO 8601),
+    max_age_seconds (created within the last N clock seconds), cursor and limit (1-1000, default 100).
+    """
+    bank = get_bank_registry().resolve(request.args.get('bank'))
+    if bank is None:
+        return jsonify({"error": "Unknown bank"}), 404
+
+    try:
+        status = SessionStatus(request.args['status'].upper()) if request.args.get('status') else None
+        created_after = datetime.fromisoformat(request.args['created_after']) \
+            if request.args.get('created_after') else None
+        created_before = datetime.fromisoformat(request.args['created_before']) \
+            if request.args.get('created_before') else None
+        if request.args.get('max_age_seconds'):
+            created_after = get_clock().now() - timedelta(seconds=float(request.args['max_age_seconds']))
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+        sessions, next_cursor = bank.session_manager.list_sessions(
+            status, created_after, created_before, request.args.get('cursor'), limit
+        )
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameter: {e}"}), 400
+
+    result = {
+        'bank': bank.bank_id,
+        'counts': bank.session_manager.status_counts(),
+        'sessions': [
+            {key: value for key, value in session.to_dict().items() if key != 'data'}
+            for session in sessions
+        ],
+        'next_cursor': next_cursor
+    }
+    if created_after or created_before:
+        result['matching'] = bank.session_manager.count_created(created_after, created_before, status)
+    return jsonify(result), 200
+
+
+@admin_bp.route('/reload', methods=['POST'])
+def reload_configuration():
+    """
+    Rebuild configuration, datasets and banks in the background of running requests and swap them in.
+    Returns 200 with build and swap times, or 500 with the error when the new version could not be built.
+    """
+    result = get_reloader().reload(trigger='admin')
+    return jsonify(result), 200 if result['ok'] else 500
+
+
+@admin_bp.route('/reload', methods=['GET'])
+def reload_status():
+    """Reload counters and the outcome of the last reload"""
+    return jsonify(get_reloader().stats()), 200
+
+
+def _heap_inspector_or_error():
+    heap_inspector = get_heap_inspector()
+    if heap_inspector is None:
+        return None, (jsonify({"error": "Heap inspector is disabled, set HEAP_INSPECTOR_ENABLED=true"}), 409)
+    return heap_inspector, None
+
+
+@admin_bp.route('/heap', methods=['GET'])
+def heap_status():
+    """Live object counts, gauges, traced heap size, RSS history and the stored snapshots"""
+    heap_inspector, error = _heap_inspector_or_error()
+    if error:
+        return error
+    result = heap_inspector.memory()
+    result['objects'] = heap_inspector.object_counts()
+    result['snapshots'] = heap_inspector.snapshots()
+    return jsonify(result), 200
+
+
+@admin_bp.route('/heap/snapshot', methods=['POST'])
+def take_heap_snapshot():
+    """
+    Take a heap snapshot and return its top allocation sites.
+    Query parameters: label, limit (default 20), group_by ('lineno' or 'filename').
+    """
+    heap_inspector, error = _heap_inspector_or_error()
+    if error:
+        return error
+    try:
+        limit = int(request.args.get('limit', 20))
+        group_by = request.args.get('group_by', 'lineno')
+        if group_by not in ('lineno', 'filename'):
+            raise ValueError(f"group_by must be lineno or filename, got {group_by}")
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameter: {e}"}), 400
+
+    snapshot_id = heap_inspector.take_snapshot(request.args.get('label', ''))
+    logger.info(f"Took heap snapshot {snapshot_id}")
+    return jsonify({
+        'id': snapshot_id,
+        'top': heap_inspector.top_allocations(snapshot_id, limit, group_by)
+    }), 200
+
+
+@admin_bp.route('/heap/diff', methods=['GET'])
+def diff_heap_snapshots():
+    """
+    Allocation sites that grew the most between two snapshots.
+    Query parameters: from (snapshot ID), to (snapshot ID; a new snapshot is taken when omitted),
+    limit (default 20), group_by ('lineno' or 'filename').
+    """
+    heap_inspector, error = _heap_inspector_or_error()
+    if error:
+        return error
+    try:
+        from_id = int(request.args['from'])
+        limit = int(request.args.get('limit', 20))
+        group_by = request.args.get('group_by', 'lineno')
+        if group_by not in ('lineno', 'filename'):
+            raise ValueError(f"group_by must be lineno or filename, got {group_by}")
+        to_id = int(request.args['to']) if request.args.get('to') else heap_inspector.take_snapshot('diff')
+        diff = heap_inspector.diff(from_id, to_id, limit, group_by)
+    except KeyError as e:
+        return jsonify({"error": f"Missing or unknown snapshot: {e}"}), 404
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameter: {e}"}), 400
+    return jsonify({'from': from_id, 'to': to_id, 'diff': diff}), 200
+
+
+def _json_object_body():
+    """The request's JSON body as a dict ({} when there is none), or None when it is not a JSON object"""
+    body = request.get_json(silent=True)
+    if body is None:
+        return {}
+    return body if isinstance(body, dict) else None
+
+
+@admin_bp.route('/clock', methods=['GET'])
+def clock_status():
+    """Report the active clock and its current time"""
+    return jsonify(get_clock().describe()), 200
+
+
+@admin_bp.route('/clock/advance', methods=['POST'])
+def advance_clock():
+    """
+    Move the virtual clock forward.
+    Takes the number of seconds from the 'seconds' query parameter or JSON body.
+    """
+    clock = get_clock()
+    if not hasattr(clock, 'advance'):
+        return jsonify({"error": "The system clock cannot be advanced, set CLOCK_MODE=virtual"}), 409
+
+    body = _json_object_body()
+    if body is None:
+        return jsonify({"error": "JSON body must be an object, e.g. {\"seconds\": 60}"}), 400
+    try:
+        seconds = float(request.args.get('seconds', body.get('seconds', 0)))
+        now = clock.advance(seconds)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid seconds value: {e}"}), 400
+
+    logger.info(f"Clock advanced by {seconds} seconds to {now.isoformat()}")
+    return jsonify(clock.describe()), 200
+
+
+@admin_bp.route('/clock/speed', methods=['POST'])
+def set_clock_speed():
+    """Change the virtual clock speed multiplier ('speed' query parameter or JSON body)"""
+    clock = get_clock()
+    if not hasattr(clock, 'set_speed'):
+        return jsonify({"error": "The system clock speed is fixed, set CLOCK_MODE=virtual"}), 409
+
+    body = _json_object_body()
+    if body is None:
+        return jsonify({"error": "JSON body must be an object, e.g. {\"speed\": 10}"}), 400
+    try:
+        clock.set_speed(float(request.args.get('speed', body.get('speed', 1))))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid speed value: {e}"}), 400
+
+    return jsonify(clock.describe()), 200
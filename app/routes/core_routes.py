@@ -3,12 +3,13 @@ Core API routes for the Bank Data API
 Implements the main data exchange endpoints
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from app.models import validate_psn, validate_uuid, ValidationError, SessionStatus
-from app.services.session_manager import session_manager
-from app.services.mock_data_service import mock_bank_service
-import threading
-import time
+from app.services.bank_registry import get_bank_registry, BankContext
+from app.services.consent_scheduler import get_consent_scheduler
+from app.services.idempotency_cache import get_idempotency_cache
+from app.services.admission_controller import get_admission_controller
+from app.services.bank_data_backend import BackendUnavailableError
 
 # Import logger after other imports to avoid circular import issues
 try:
@@ -32,37 +33,64 @@ def log_request(request_id: str, operation: str, details: str):
         logger.info(f"{operation}: {details}")
 
 
-def simulate_consent_process(session_id: str, psn: str):
+def current_bank() -> BankContext:
+    """Bank serving the current request (None for an unknown /banks/<bank_id> prefix)"""
+    return get_bank_registry().resolve(g.get('bank_id'), request.host)
+
+
+def simulate_consent_process(bank: BankContext, session_id: str, psn: str):
     """
-    Simulate the consent acquisition process in a separate thread.
+    Simulate the consent acquisition process on the consent scheduler.
+    The caller must have admitted the process with the admission controller; it is released once
+    the session leaves PENDING.
     In a real implementation, this would integrate with the bank's consent management system.
     """
-    def consent_worker():
-        time.sleep(2)  # Simulate time for consent process
-        
+    session_manager = bank.session_manager
+    mock_bank_service = bank.data_service
+
+    def deliver_data():
+        try:
+            # Get the banking data
+            bank_data = mock_bank_service.get_banking_data(psn)
+            if bank_data:
+                if session_manager.update_session_status(session_id, SessionStatus.READY, bank_data):
+                    logger.info(f"Data ready for session {session_id}")
+            else:
+                session_manager.update_session_status(session_id, SessionStatus.EXPIRED)
+                logger.info(f"No data available, expired session {session_id}")
+        except BackendUnavailableError as e:
+            session_manager.update_session_status(session_id, SessionStatus.EXPIRED)
+            logger.warning(f"Backend unavailable, expired session {session_id}: {e}")
+        finally:
+            get_admission_controller().release()
+
+    def consent_step():
         # Check if citizen will deny consent
         if mock_bank_service.will_deny_consent(psn):
-            session_manager.update_session_status(session_id, SessionStatus.DENIED)
-            logger.info(f"Consent denied for session {session_id}")
+            if session_manager.update_session_status(session_id, SessionStatus.DENIED):
+                logger.info(f"Consent denied for session {session_id}")
+            get_admission_controller().release()
             return
         
         # Simulate longer processing for some PSNs
         if mock_bank_service.requires_slow_processing(psn):
-            time.sleep(5)
+            get_consent_scheduler().schedule(bank.slow_processing_delay_seconds, deliver_data, key=session_id)
+            return
         
-        # Get the banking data
-        bank_data = mock_bank_service.get_banking_data(psn)
-        if bank_data:
-            session_manager.update_session_status(session_id, SessionStatus.READY, bank_data)
-            logger.info(f"Data ready for session {session_id}")
-        else:
-            session_manager.update_session_status(session_id, SessionStatus.EXPIRED)
-            logger.info(f"No data available, expired session {session_id}")
+        deliver_data()
     
-    # Start consent process in background
-    consent_thread = threading.Thread(target=consent_worker)
-    consent_thread.daemon = True
-    consent_thread.start()
+    # Start consent process after the simulated consent delay
+    get_consent_scheduler().schedule(bank.consent_delay_seconds, consent_step, key=session_id)
+
+
+def cancel_consent_process(session_id: str):
+    """
+    Stop the pending consent process of a superseded session and give back its admission slot.
+    A step that is already running releases the slot itself; its status update is refused.
+    """
+    if get_consent_scheduler().cancel(session_id):
+        get_admission_controller().release()
+        logger.info(f"Cancelled consent process for superseded session {session_id}")
 
 
 @core_bp.route('/citizen/<psn>/BankingData', methods=['GET'])
@@ -74,30 +102,64 @@ def data_request(psn: str):
     request_id = request.headers.get('X-Request-ID')
     log_request(request_id, "data_request", f"Received request for PSN {psn}")
     
+    bank = current_bank()
+    if bank is None:
+        log_request(request_id, "data_request", f"Unknown bank {g.get('bank_id')}")
+        return jsonify({"error": "Unknown bank"}), 404
+    
     # Validate PSN format
     if not validate_psn(psn):
         log_request(request_id, "data_request", f"Invalid PSN format: {psn}")
         return jsonify({"error": "Invalid PSN format"}), 400
     
     # Check if bank has data for this PSN
-    if not mock_bank_service.has_data_for_psn(psn):
+    try:
+        has_data = bank.data_service.has_data_for_psn(psn)
+    except BackendUnavailableError as e:
+        log_request(request_id, "data_request", f"Backend unavailable for PSN {psn}: {e}")
+        return jsonify({"error": "Bank data backend unavailable, retry later"}), 503, \
+            {'Retry-After': str(max(1, int(e.retry_after_seconds)))}
+    if not has_data:
         log_request(request_id, "data_request", f"No data available for PSN {psn}")
         return jsonify({"error": "No data available for this citizen"}), 404
     
-    # Create new session (this will expire any existing session for the PSN)
-    session = session_manager.create_session(psn)
+    admission_controller = get_admission_controller()
     
-    # Start the consent acquisition process
-    simulate_consent_process(session.session_id, psn)
+    def start_session():
+        # Shed load before creating anything once too many consent processes are in flight
+        if not admission_controller.admit():
+            return None
+        
+        # Create new session (this will expire any existing session for the PSN)
+        session = bank.session_manager.create_session(psn, request_id, on_superseded=cancel_consent_process)
+        
+        # Start the consent acquisition process
+        simulate_consent_process(bank, session.session_id, psn)
+        
+        log_request(request_id, "data_request", f"Created session {session.session_id} for PSN {psn}")
+        
+        # Return session info
+        return {
+            "sessionID": session.session_id,
+            "expiresAt": session.expires_at.isoformat() if session.expires_at else None
+        }
     
-    log_request(request_id, "data_request", f"Created session {session.session_id} for PSN {psn}")
+    # Retries carrying the same X-Request-ID get the original session instead of a new one
+    idempotency_cache = get_idempotency_cache()
+    replayed = False
+    if idempotency_cache is not None and request_id:
+        response, replayed = idempotency_cache.get_or_create((bank.bank_id, request_id, psn), start_session)
+    else:
+        response = start_session()
     
-    # Return session info
-    response = {
-        "sessionID": session.session_id,
-        "expiresAt": session.expires_at.isoformat() if session.expires_at else None
-    }
+    if response is None:
+        log_request(request_id, "data_request", f"Overloaded, shedding request for PSN {psn}")
+        return jsonify({"error": "Service overloaded, retry later"}), 503, \
+            {'Retry-After': str(admission_controller.retry_after_seconds)}
     
+    if replayed:
+        log_request(request_id, "data_request", f"Replaying session {response['sessionID']} for PSN {psn}")
+        return jsonify(response), 200, {'X-Idempotent-Replay': 'true'}
     return jsonify(response), 200
 
 
@@ -111,6 +173,11 @@ def get_data(psn: str, session_id: str):
     request_id = request.headers.get('X-Request-ID')
     log_request(request_id, "get_data", f"Data retrieval request for PSN {psn}, session {session_id}")
     
+    bank = current_bank()
+    if bank is None:
+        log_request(request_id, "get_data", f"Unknown bank {g.get('bank_id')}")
+        return jsonify({"error": "Unknown bank"}), 404
+    
     # Validate inputs
     if not validate_psn(psn):
         log_request(request_id, "get_data", f"Invalid PSN format: {psn}")
@@ -123,7 +190,7 @@ def get_data(psn: str, session_id: str):
     log_request(request_id, "get_data", f"Perfectly valid sessionID: {session_id}")
     
     # Get session that matches both PSN and session ID
-    session = session_manager.get_session_for_psn_and_id(psn, session_id)
+    session = bank.session_manager.get_session_for_psn_and_id(psn, session_id)
     
     if not session:
         log_request(request_id, "get_data", f"No matching session found for PSN {psn} and session {session_id}")
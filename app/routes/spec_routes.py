@@ -4,9 +4,8 @@ Serves the original API specification at a separate URL from the API endpoints
 """
 
 from flask import Blueprint, send_file, jsonify, Response
-from app.config import get_logger
+from app.config import get_logger, get_config
 import os
-import yaml
 
 logger = get_logger('routes.spec')
 
@@ -97,6 +96,7 @@ def get_api_spec_json():
         logger.info(f"Serving API specification (JSON) from: {spec_file_path}")
         
         if os.path.exists(spec_file_path):
+            import yaml  # Imported on first use to keep application startup fast
             with open(spec_file_path, 'r', encoding='utf-8') as f:
                 spec_data = yaml.safe_load(f)
             
@@ -140,4 +140,13 @@ def api_info():
             
     except Exception as e:
         logger.error(f"Error serving index page: {str(e)}")
-        return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@spec_bp.route('/health', methods=['GET'])
+def health():
+    """
+    Liveness probe used by the cluster router's health checks.
+    Not part of the API specification.
+    """
+    return jsonify({"status": "ok", "node": get_config().NODE_ID}), 200
@@ -3,11 +3,13 @@ Support API routes for the Bank Data API
 Implements session status checking and other supporting endpoints
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from app.models import validate_uuid, SessionStatus
-from app.services.session_manager import session_manager
-from app.config import get_logger
-from datetime import datetime
+from app.services.bank_registry import get_bank_registry
+from app.services.clock import get_clock
+from app.services.consent_scheduler import get_consent_scheduler
+from app.config import get_logger, get_config
+import math
 
 logger = get_logger('routes.support')
 
@@ -23,19 +25,15 @@ def log_request(request_id: str, operation: str, details: str):
 
 
 # Rate limiting - simple in-memory store (in production, use Redis or similar)
-from app.config import Config
-config = Config()
-
 _rate_limit_store = {}
-_rate_limit_window = config.RATE_LIMIT_WINDOW_SECONDS
-_max_requests_per_minute = config.RATE_LIMIT_MAX_REQUESTS
-
-logger.info(f"Rate limiting configured: {_max_requests_per_minute} requests per {_rate_limit_window} seconds")
 
 
 def check_rate_limit(session_id: str) -> bool:
     """Simple rate limiting check"""
-    current_time = datetime.now().timestamp()
+    config = get_config()
+    window_seconds = config.RATE_LIMIT_WINDOW_SECONDS
+    max_requests = config.RATE_LIMIT_MAX_REQUESTS
+    current_time = get_clock().time()
     
     if session_id not in _rate_limit_store:
         _rate_limit_store[session_id] = []
@@ -43,10 +41,10 @@ def check_rate_limit(session_id: str) -> bool:
     # Clean old requests outside the window
     requests = _rate_limit_store[session_id]
     _rate_limit_store[session_id] = [req_time for req_time in requests 
-                                   if current_time - req_time < _rate_limit_window]
+                                   if current_time - req_time < window_seconds]
     
     # Check if we're over the limit
-    if len(_rate_limit_store[session_id]) >= _max_requests_per_minute:
+    if len(_rate_limit_store[session_id]) >= max_requests:
         return False
     
     # Add this request
@@ -54,6 +52,57 @@ def check_rate_limit(session_id: str) -> bool:
     return True
 
 
+def rate_limit_retry_after(session_id: str) -> float:
+    """Clock seconds until the oldest request in the session's rate-limit window drops out of it"""
+    requests = _rate_limit_store.get(session_id)
+    if not requests:
+        return 0.0
+    return max(requests[0] + get_config().RATE_LIMIT_WINDOW_SECONDS - get_clock().time(), 0.0)
+
+
+def estimate_time_to_ready(session_id: str) -> float:
+    """
+    Clock seconds until a PENDING session's next consent step is due.
+    Falls back to the consent queue latency when the step is already running.
+    """
+    scheduler = get_consent_scheduler()
+    due = scheduler.due_time(session_id)
+    if due is None:
+        return scheduler.queue_latency()
+    return max(due - get_clock().time(), 0.0)
+
+
+def retry_after_header(clock_seconds: float) -> dict:
+    """Retry-After header (whole wall-clock seconds, at least 1) for a delay measured on the clock"""
+    real_seconds = get_clock().to_real_seconds(clock_seconds)
+    if real_seconds is None:
+        real_seconds = clock_seconds  # Frozen virtual clock: the delay only passes when advanced
+    return {'Retry-After': str(max(1, math.ceil(real_seconds)))}
+
+
+def export_rate_limit_state() -> dict:
+    """Copy the rate-limit windows that are still open, for snapshots"""
+    window_seconds = get_config().RATE_LIMIT_WINDOW_SECONDS
+    current_time = get_clock().time()
+    return {session_id: [t for t in times if current_time - t < window_seconds]
+            for session_id, times in list(_rate_limit_store.items())
+            if times and current_time - times[-1] < window_seconds}
+
+
+def restore_rate_limit_state(state: dict):
+    """Load rate-limit windows from a snapshot"""
+    _rate_limit_store.update(state)
+
+
+def rate_limit_store_size() -> dict:
+    """Sessions and timestamps held by the rate-limit store, for the heap inspector"""
+    return {
+        'sessions': len(_rate_limit_store),
+        'entries': sum(len(times) for times in list(_rate_limit_store.values()))
+    }
+
+
+
 @support_bp.route('/request/<session_id>', methods=['GET'])
 def get_session_status(session_id: str):
     """
@@ -63,6 +112,11 @@ def get_session_status(session_id: str):
     request_id = request.headers.get('X-Request-ID')
     log_request(request_id, "get_session_status", f"Status check for session {session_id}")
     
+    bank = get_bank_registry().resolve(g.get('bank_id'), request.host)
+    if bank is None:
+        log_request(request_id, "get_session_status", f"Unknown bank {g.get('bank_id')}")
+        return jsonify({"error": "Unknown bank"}), 404
+    
     # Validate session ID format
     if not validate_uuid(session_id):
         log_request(request_id, "get_session_status", f"Invalid session ID format: {session_id}")
@@ -71,10 +125,10 @@ def get_session_status(session_id: str):
     # Check rate limiting
     if not check_rate_limit(session_id):
         log_request(request_id, "get_session_status", f"Rate limit exceeded for session {session_id}")
-        return jsonify({"error": "Too many requests"}), 429
+        return jsonify({"error": "Too many requests"}), 429, retry_after_header(rate_limit_retry_after(session_id))
     
     # Get session
-    session = session_manager.get_session(session_id)
+    session = bank.session_manager.get_session(session_id)
     
     if not session:
         log_request(request_id, "get_session_status", f"Session {session_id} not found or expired")
@@ -86,7 +140,7 @@ def get_session_status(session_id: str):
         return '', 200
     elif session.status == SessionStatus.PENDING:
         log_request(request_id, "get_session_status", f"Session {session_id} is pending")
-        return '', 202
+        return '', 202, retry_after_header(estimate_time_to_ready(session.session_id))
     elif session.status == SessionStatus.DENIED:
         log_request(request_id, "get_session_status", f"Session {session_id} was denied")
         return '', 590
@@ -0,0 +1,92 @@
+"""
+Admission controller for the Bank Data API
+Bounds the number of in-flight consent processes and sheds new session requests when overloaded
+"""
+
+from typing import Any, Callable, Dict, Optional
+from app.config import get_logger, get_config, LazySingleton
+import threading
+
+logger = get_logger('services.admission')
+
+
+class AdmissionController:
+    """
+    Counts in-flight consent processes against a limit.
+    With a target latency the limit adapts: it shrinks by 10% whenever the consent queue latency
+    exceeds the target and grows by one per completion otherwise (never above max_pending).
+    """
+
+    def __init__(self, max_pending: int = 0, target_latency_seconds: float = 0.0,
+                 latency_source: Optional[Callable[[], float]] = None, retry_after_seconds: int = 1):
+        """Initialize the controller; max_pending of 0 means unlimited"""
+        self._max_pending = max_pending
+        self._limit = float(max_pending)
+        self._target_latency = target_latency_seconds
+        self._latency_source = latency_source
+        self._retry_after_seconds = retry_after_seconds
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._shed = 0
+
+    @property
+    def retry_after_seconds(self) -> int:
+        return self._retry_after_seconds
+
+    def admit(self, force: bool = False) -> bool:
+        """
+        Try to start a consent process. Returns False when the request should be shed.
+        force=True always admits (used for sessions restored from a snapshot).
+        """
+        with self._lock:
+            if not force and self._max_pending and self._in_flight >= int(self._limit):
+                self._shed += 1
+                return False
+            self._in_flight += 1
+            self._admitted += 1
+            return True
+
+    def release(self):
+        """Mark a consent process as finished and adapt the limit to the observed queue latency"""
+        latency = self._latency_source() if self._latency_source and self._target_latency else None
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+            if latency is None or not self._max_pending:
+                return
+            if latency > self._target_latency:
+                self._limit = max(1.0, self._limit * 0.9)
+            else:
+                self._limit = min(float(self._max_pending), self._limit + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the admin API"""
+        with self._lock:
+            return {
+                'in_flight': self._in_flight,
+                'limit': int(self._limit) if self._max_pending else None,
+                'max_pending': self._max_pending or None,
+                'adaptive': bool(self._target_latency),
+                'queue_latency_seconds': round(self._latency_source(), 4) if self._latency_source else None,
+                'admitted': self._admitted,
+                'shed': self._shed
+            }
+
+
+def _create_admission_controller() -> AdmissionController:
+    from app.services.consent_scheduler import get_consent_scheduler
+    config = get_config()
+    if config.ADMISSION_MAX_PENDING:
+        logger.info(f"Admission control: up to {config.ADMISSION_MAX_PENDING} pending consent processes"
+                    + (f", adaptive to {config.ADMISSION_TARGET_LATENCY_MS} ms queue latency"
+                       if config.ADMISSION_TARGET_LATENCY_MS else ""))
+    return AdmissionController(
+        max_pending=config.ADMISSION_MAX_PENDING,
+        target_latency_seconds=config.ADMISSION_TARGET_LATENCY_MS / 1000,
+        latency_source=lambda: get_consent_scheduler().queue_latency(),
+        retry_after_seconds=config.ADMISSION_RETRY_AFTER_SECONDS
+    )
+
+
+# Global admission controller instance, created on first use
+get_admission_controller = LazySingleton(_create_admission_controller)
@@ -0,0 +1,189 @@
+"""
+Audit log for the Bank Data API
+Appends session lifecycle events as JSON lines from a dedicated writer thread with group commit
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+from app.config import get_logger, get_config, LazySingleton
+from app.services.clock import get_clock
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+logger = get_logger('services.audit_log')
+
+SEGMENT_PATTERN = 'audit-*.jsonl'
+
+# Session lifecycle events
+EVENT_CREATED = 'created'
+EVENT_SUPERSEDED = 'superseded'
+
+
+class AuditLog:
+    """
+    Append-only JSONL audit log split into numbered segments.
+    record() only enqueues; the writer thread writes whatever has queued up as one batch
+    and fsyncs once per batch, so request threads never wait for the disk.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = 64 * 1024 * 1024,
+                 batch_max: int = 512, flush_interval_seconds: float = 0.05, clock=None):
+        """Open (or continue) the newest segment in directory and start the writer thread"""
+        os.makedirs(directory, exist_ok=True)
+        self._clock = clock or get_clock()
+        self._directory = directory
+        self._segment_max_bytes = segment_max_bytes
+        self._batch_max = batch_max
+        self._flush_interval = flush_interval_seconds
+        self._queue: 'queue.SimpleQueue' = queue.SimpleQueue()
+        self._closed = threading.Event()
+        self._events = 0
+        self._batches = 0
+        self._write_seconds = 0.0
+
+        segments = list_segments(directory)
+        self._segment_index = _segment_number(segments[-1]) if segments else 1
+        self._file = open(self._segment_path(self._segment_index), 'ab')
+
+        self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        logger.info(f"Audit log writing to {self._segment_path(self._segment_index)}")
+
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self._directory, f'audit-{index:06d}.jsonl')
+
+    def record(self, event: str, session_id: str, psn: str, request_id: Optional[str] = None, **fields):
+        """
+        Queue a lifecycle event; never blocks on I/O.
+        ts is application clock time at session timestamp (microsecond) precision, wall_ts the real time.
+        """
+        entry = {'ts': round(self._clock.time(), 6), 'wall_ts': time.time(), 'event': event,
+                 'session': session_id, 'psn': psn, 'request_id': request_id}
+        entry.update(fields)
+        self._queue.put(entry)
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            batch = [entry]
+            # Group commit: collect what arrives within the flush interval, up to batch_max entries
+            deadline = time.monotonic() + self._flush_interval
+            stop = False
+            while len(batch) < self._batch_max:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} audit events: {e}")
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        data = ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in batch).encode('utf-8')
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._events += len(batch)
+        self._batches += 1
+        self._write_seconds += time.perf_counter() - started
+
+        if self._file.tell() >= self._segment_max_bytes:
+            self._file.close()
+            self._segment_index += 1
+            self._file = open(self._segment_path(self._segment_index), 'ab')
+            logger.info(f"Audit log rotated to {self._segment_path(self._segment_index)}")
+
+    def close(self):
+        """Flush queued events and stop the writer thread"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._file.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Writer counters for the admin API"""
+        return {
+            'segment': self._segment_path(self._segment_index),
+            'events_written': self._events,
+            'batches': self._batches,
+            'avg_batch_size': round(self._events / self._batches, 2) if self._batches else 0.0,
+            'avg_batch_write_ms': round(self._write_seconds / self._batches * 1000, 3) if self._batches else 0.0,
+            'queued': self._queue.qsize()
+        }
+
+
+def _segment_number(path: str) -> int:
+    return int(os.path.basename(path)[len('audit-'):-len('.jsonl')])
+
+
+def list_segments(directory: str) -> List[str]:
+    """Audit segment files in write order"""
+    return sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN)), key=_segment_number)
+
+
+def read_events(directory: str, session_id: Optional[str] = None, psn: Optional[str] = None,
+                request_id: Optional[str] = None, event: Optional[str] = None,
+                since: Optional[float] = None, until: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield audit events matching all given filters, oldest first.
+    Lines are pre-filtered by substring before JSON decoding, so selective queries stay fast.
+    """
+    needles = [value for value in (session_id, psn, request_id) if value]
+    for path in list_segments(directory):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if needles and not all(needle in line for needle in needles):
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Torn final line of a crashed writer
+                if session_id and entry.get('session') != session_id:
+                    continue
+                if psn and entry.get('psn') != psn:
+                    continue
+                if request_id and entry.get('request_id') != request_id:
+                    continue
+                if event and entry.get('event') != event:
+                    continue
+                if since is not None and entry['ts'] < since:
+                    continue
+                if until is not None and entry['ts'] > until:
+                    continue
+                yield entry
+
+
+def _create_audit_log() -> Optional[AuditLog]:
+    config = get_config()
+    if not config.AUDIT_LOG_DIR:
+        return None
+    return AuditLog(
+        config.AUDIT_LOG_DIR,
+        segment_max_bytes=int(config.AUDIT_LOG_SEGMENT_MB * 1024 * 1024),
+        batch_max=config.AUDIT_LOG_BATCH_MAX,
+        flush_interval_seconds=config.AUDIT_LOG_FLUSH_MS / 1000
+    )
+
+
+# Global audit log instance, created on first use (None unless AUDIT_LOG_DIR is set)
+get_audit_log = LazySingleton(_create_audit_log)
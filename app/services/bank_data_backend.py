@@ -0,0 +1,384 @@
+"""
+Bank data backends for the Bank Data API
+Lets the mock proxy banking data lookups to a slower core-banking stand-in (HTTP or SQLite)
+behind connection pooling, a circuit breaker and a read-through cache with single-flight coalescing
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from app.models import BankData
+from app.config import get_logger, get_config, LazySingleton
+import http.client
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+logger = get_logger('services.bank_data_backend')
+
+# Errors from a keep-alive connection the server has already closed
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class BackendUnavailableError(Exception):
+    """Raised when the backend fails or its circuit breaker is open"""
+
+    def __init__(self, message: str, retry_after_seconds: float = 1.0):
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class PoolTimeoutError(BackendUnavailableError):
+    """Raised when no pooled connection frees up in time; local saturation, not a backend failure"""
+
+
+class ConnectionPool:
+    """Bounded LIFO pool of reusable connections"""
+
+    def __init__(self, factory: Callable[[], Any], size: int, timeout_seconds: float):
+        """Initialize an empty pool; connections are opened on demand up to size"""
+        self._factory = factory
+        self._idle: 'queue.LifoQueue' = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._timeout = timeout_seconds
+        self._size = size
+        self._created = 0
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is closed instead of returned when the block raises"""
+        if not self._slots.acquire(timeout=self._timeout):
+            raise PoolTimeoutError("Timed out waiting for a backend connection")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._factory()
+                self._created += 1
+            try:
+                yield conn
+            except BaseException:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                raise
+            self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {'size': self._size, 'idle': self._idle.qsize(), 'opened': self._created}
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets a single trial call through after reset_seconds"""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self._failure_threshold = failure_threshold
+        self._reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise BackendUnavailableError while the circuit is open"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self._reset_seconds - time.monotonic()
+            if remaining > 0 or self._trial_in_progress:
+                raise BackendUnavailableError("Backend circuit breaker is open", max(remaining, 1.0))
+            self._trial_in_progress = True  # Half-open: let one call through
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def release(self):
+        """End a call that says nothing about backend health, freeing the half-open trial slot"""
+        with self._lock:
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_progress = False
+            if self._opened_at is not None or self._failures >= self._failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Opening backend circuit breaker after {self._failures} failures")
+                self._opened_at = time.monotonic()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            return 'half-open' if time.monotonic() >= self._opened_at + self._reset_seconds else 'open'
+
+
+class HttpBankDataBackend:
+    """Fetches BankData JSON from an HTTP service over pooled keep-alive connections"""
+
+    def __init__(self, url_template: str, pool_size: int = 8, timeout_seconds: float = 2.0):
+        """url_template must contain '{psn}', e.g. http://core-banking:9000/accounts/{psn}"""
+        if '{psn}' not in url_template:
+            raise ValueError("Backend URL must contain a {psn} placeholder")
+        parts = urlsplit(url_template)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self._path_template = url_template[url_template.index(parts.netloc) + len(parts.netloc):] or '/'
+        self._pool = ConnectionPool(
+            lambda: connection_class(parts.hostname, parts.port, timeout=timeout_seconds),
+            pool_size,
+            timeout_seconds
+        )
+        self.name = f"http:{parts.netloc}"
+
+    def fetch(self, psn: str) -> Optional[BankData]:
+        """
+        Return the citizen's data, None on 404, raise on any other failure.
+        A request that fails on a stale keep-alive connection is retried once on a fresh one.
+        """
+        for attempt in range(2):
+            try:
+                with self._pool.connection() as conn:
+                    conn.request('GET', self._path_template.format(psn=psn), headers={'Accept': 'application/json'})
+                    response = conn.getresponse()
+                    body = response.read()
+                    if response.will_close:
+                        conn.close()  # Reconnects transparently on next use
+                break
+            except STALE_CONNECTION_ERRORS:
+                if attempt:
+                    raise
+                self._pool.close()  # Idle connections from before a backend restart are all stale
+        if response.status == 404:
+            return None
+        if response.status != 200:
+            raise BackendUnavailableError(f"Backend returned HTTP {response.status}")
+        return BankData.from_dict(json.loads(body))
+
+    def close(self):
+        self._pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'pool': self._pool.stats()}
+
+
+class SqliteBankDataBackend:
+    """
+    Reads BankData from a SQLite table bank_data(psn TEXT PRIMARY KEY, DepositInterest,
+    DebtSecurityInterest, SecuritiesDeductable, NonPersonifiedIncome) over pooled connections
+    """
+
+    _QUERY = ("SELECT DepositInterest, DebtSecurityInterest, SecuritiesDeductable, NonPersonifiedIncome "
+              "FROM bank_data WHERE psn = ?")
+
+    def __init__(self, path: str, pool_size: int = 8, timeout_seconds: float = 2.0):
+        """Open connections to the database file lazily"""
+        self._pool = ConnectionPool(
+            lambda: sqlite3.connect(path, timeout=timeout_seconds, check_same_thread=False),
+            pool_size,
+            timeout_seconds
+        )
+        self.name = f"sqlite:{path}"
+
+    def fetch(self, psn: str) -> Optional[BankData]:
+        """Return the citizen's data, or None when there is no row"""
+        with self._pool.connection() as conn:
+            row = conn.execute(self._QUERY, (psn,)).fetchone()
+        return BankData(*row) if row else None
+
+    def list_psns(self) -> Iterator[str]:
+        """Every PSN in the table, for building the unknown-PSN filter"""
+        with self._pool.connection() as conn:
+            for (psn,) in conn.execute("SELECT psn FROM bank_data"):
+                yield psn
+
+    def close(self):
+        self._pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'pool': self._pool.stats()}
+
+
+class _Flight:
+    """Result slot shared by concurrent callers of the same key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[BankData] = None
+        self.error: Optional[BaseException] = None
+
+
+class CachedBankDataBackend:
+    """
+    Read-through TTL/LRU cache in front of a backend.
+    Concurrent misses for the same PSN share one backend call (single-flight), and calls go
+    through a circuit breaker. Negative results (no data) are cached too.
+    """
+
+    def __init__(self, backend, ttl_seconds: float = 60.0, max_entries: int = 10000,
+                 breaker: Optional[CircuitBreaker] = None):
+        self._backend = backend
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._breaker = breaker or CircuitBreaker()
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Optional[BankData]]]' = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._follow_up_hits = 0
+        self._coalesced = 0
+        self._backend_calls = 0
+        self._backend_errors = 0
+        self._pool_timeouts = 0
+        self._backend_total_seconds = 0.0
+        self._backend_max_seconds = 0.0
+
+    def fetch(self, psn: str, follow_up: bool = False) -> Optional[BankData]:
+        """
+        Return cached data for the PSN or fetch it once from the backend.
+        follow_up=True marks a re-read of a PSN the caller looked up moments ago (the consent step after
+        the existence check); its hits are counted as follow_up_hits and kept out of the hit ratio.
+        """
+        with self._lock:
+            entry = self._entries.get(psn)
+            if entry is not None and time.monotonic() - entry[0] < self._ttl:
+                self._entries.move_to_end(psn)
+                if follow_up:
+                    self._follow_up_hits += 1
+                else:
+                    self._hits += 1
+                return entry[1]
+            self._misses += 1
+            flight = self._flights.get(psn)
+            leader = flight is None
+            if leader:
+                flight = self._flights[psn] = _Flight()
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._call_backend(psn)
+            with self._lock:
+                self._entries[psn] = (time.monotonic(), flight.result)
+                self._entries.move_to_end(psn)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[psn]
+            flight.done.set()
+
+    def _call_backend(self, psn: str) -> Optional[BankData]:
+        self._breaker.before_call()
+        started = time.perf_counter()
+        try:
+            result = self._backend.fetch(psn)
+        except PoolTimeoutError:
+            # Our own pool is saturated; the backend itself may be fine, so the breaker is not told
+            self._breaker.release()
+            with self._lock:
+                self._pool_timeouts += 1
+            raise
+        except Exception as e:
+            self._breaker.record_failure()
+            with self._lock:
+                self._backend_errors += 1
+            logger.warning(f"Backend {self._backend.name} failed for PSN {psn}: {e}")
+            if isinstance(e, BackendUnavailableError):
+                raise
+            raise BackendUnavailableError(f"Backend error: {e}") from e
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._backend_calls += 1
+                self._backend_total_seconds += elapsed
+                self._backend_max_seconds = max(self._backend_max_seconds, elapsed)
+        self._breaker.record_success()
+        return result
+
+    def list_psns(self) -> Optional[Iterator[str]]:
+        """Every PSN the backend knows, or None when it cannot enumerate them (HTTP)"""
+        list_psns = getattr(self._backend, 'list_psns', None)
+        return list_psns() if list_psns is not None else None
+
+    def close(self):
+        self._backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache and backend latency figures for the admin API"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            stats = {
+                'backend': self._backend.name,
+                'circuit': self._breaker.state,
+                'cache_entries': len(self._entries),
+                'cache_hits': self._hits,
+                'cache_misses': self._misses,
+                'cache_hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0,
+                'follow_up_hits': self._follow_up_hits,
+                'coalesced_calls': self._coalesced,
+                'backend_calls': self._backend_calls,
+                'backend_errors': self._backend_errors,
+                'pool_timeouts': self._pool_timeouts,
+                'backend_avg_ms': round(self._backend_total_seconds / self._backend_calls * 1000, 3)
+                if self._backend_calls else 0.0,
+                'backend_max_ms': round(self._backend_max_seconds * 1000, 3)
+            }
+        stats.update(self._backend.stats())
+        return stats
+
+
+def _create_bank_data_backend() -> Optional[CachedBankDataBackend]:
+    config = get_config()
+    if not config.BANK_BACKEND:
+        return None
+
+    if config.BANK_BACKEND == 'http':
+        backend = HttpBankDataBackend(config.BANK_BACKEND_URL, config.BANK_BACKEND_POOL_SIZE,
+                                      config.BANK_BACKEND_TIMEOUT_SECONDS)
+    elif config.BANK_BACKEND == 'sqlite':
+        backend = SqliteBankDataBackend(config.BANK_BACKEND_URL, config.BANK_BACKEND_POOL_SIZE,
+                                        config.BANK_BACKEND_TIMEOUT_SECONDS)
+    else:
+        raise ValueError(f"Unknown BANK_BACKEND '{config.BANK_BACKEND}', expected 'http' or 'sqlite'")
+
+    logger.info(f"Proxying bank data lookups to {backend.name} "
+                f"(pool {config.BANK_BACKEND_POOL_SIZE}, cache TTL {config.BANK_BACKEND_CACHE_TTL_SECONDS}s)")
+    return CachedBankDataBackend(
+        backend,
+        ttl_seconds=config.BANK_BACKEND_CACHE_TTL_SECONDS,
+        max_entries=config.BANK_BACKEND_CACHE_MAX_ENTRIES,
+        breaker=CircuitBreaker(config.BANK_BACKEND_FAILURE_THRESHOLD, config.BANK_BACKEND_RESET_SECONDS)
+    )
+
+
+# Global backend instance, created on first use (None unless BANK_BACKEND is set)
+get_bank_data_backend = LazySingleton(_create_bank_data_backend)
@@ -0,0 +1,111 @@
+"""
+Bank registry for the Bank Data API
+Hosts several logical banks in one process, each with its own sessions, dataset and consent profile
+"""
+
+from typing import Dict, Optional
+from dataclasses import dataclass
+from app.config import get_logger, get_config, LazySingleton
+from app.services.session_manager import SessionManager, get_session_manager
+from app.services.mock_data_service import MockBankDataService, get_mock_bank_service
+import json
+
+logger = get_logger('services.bank_registry')
+
+DEFAULT_BANK_ID = 'default'
+
+
+@dataclass
+class BankContext:
+    """A logical bank: isolated session namespace, dataset and consent timings"""
+    bank_id: str
+    session_manager: SessionManager
+    data_service: MockBankDataService
+    consent_delay_seconds: float = 2
+    slow_processing_delay_seconds: float = 5
+
+
+class BankRegistry:
+    """Resolves the bank serving a request from a /banks/<bank_id> prefix or the Host header"""
+
+    def __init__(self, default_bank: BankContext):
+        """Initialize with the default bank, which serves requests outside any bank prefix or host"""
+        self._banks: Dict[str, BankContext] = {default_bank.bank_id: default_bank}
+        self._hosts: Dict[str, str] = {}  # lower-case host name -> bank_id
+        self._default_bank_id = default_bank.bank_id
+
+    def add_bank(self, bank: BankContext, hosts=()):
+        """Register a bank and the Host header values routed to it"""
+        self._banks[bank.bank_id] = bank
+        for host in hosts:
+            self._hosts[host.lower()] = bank.bank_id
+        logger.info(f"Registered bank '{bank.bank_id}'" + (f" for hosts {', '.join(hosts)}" if hosts else ""))
+
+    def get(self, bank_id: str) -> Optional[BankContext]:
+        """Get a bank by ID"""
+        return self._banks.get(bank_id)
+
+    def banks(self) -> Dict[str, BankContext]:
+        """All registered banks by ID"""
+        return dict(self._banks)
+
+    def resolve(self, bank_id: Optional[str] = None, host: Optional[str] = None) -> Optional[BankContext]:
+        """
+        Find the bank for a request. An explicit bank_id (from the URL prefix) wins,
+        then the Host header (port ignored), then the default bank.
+        Returns None for an unknown bank_id.
+        """
+        if bank_id is not None:
+            return self._banks.get(bank_id)
+        if host and self._hosts:
+            mapped = self._hosts.get(host.split(':', 1)[0].lower())
+            if mapped:
+                return self._banks[mapped]
+        return self._banks[self._default_bank_id]
+
+
+def build_bank_registry(config, default_data_service: MockBankDataService,
+                        previous: Optional[BankRegistry] = None) -> BankRegistry:
+    """
+    Build a registry from config.BANKS_CONFIG_FILE, a JSON document of the form
+    {"banks": {"<bank_id>": {"hosts": [...], "data_file": "...", "session_ttl_minutes": 30,
+    "consent_delay_seconds": 2, "slow_processing_delay_seconds": 5}}}
+    With previous (a hot reload), banks that still exist keep their session managers and so their live sessions.
+    """
+    registry = BankRegistry(BankContext(DEFAULT_BANK_ID, get_session_manager(), default_data_service))
+    if not config.BANKS_CONFIG_FILE:
+        return registry
+
+    with open(config.BANKS_CONFIG_FILE, 'r', encoding='utf-8') as f:
+        banks_config = json.load(f).get('banks', {})
+
+    for bank_id, settings in banks_config.items():
+        if bank_id == DEFAULT_BANK_ID:
+            logger.warning(f"Bank ID '{DEFAULT_BANK_ID}' is reserved, skipping")
+            continue
+        existing = previous.get(bank_id) if previous is not None else None
+        if existing is not None:
+            session_manager = existing.session_manager
+            session_manager.set_ttl_override(settings.get('session_ttl_minutes'))
+        else:
+            session_manager = SessionManager(settings.get('session_ttl_minutes'), bank_id=bank_id)
+        bank = BankContext(
+            bank_id=bank_id,
+            session_manager=session_manager,
+            # No backend, so no PSN filter: the local set lookup is already the cheapest check
+            data_service=MockBankDataService(data_file=settings.get('data_file', ''), fp_rate=0),
+            consent_delay_seconds=settings.get('consent_delay_seconds', 2),
+            slow_processing_delay_seconds=settings.get('slow_processing_delay_seconds', 5)
+        )
+        registry.add_bank(bank, settings.get('hosts', []))
+
+    logger.info(f"Multi-bank mode: {len(banks_config)} banks from {config.BANKS_CONFIG_FILE}")
+    return registry
+
+
+def _create_bank_registry() -> BankRegistry:
+    return build_bank_registry(get_config(), get_mock_bank_service())
+
+
+# Global bank registry instance, created on first use
+get_bank_registry = LazySingleton(_create_bank_registry)
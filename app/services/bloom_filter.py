@@ -0,0 +1,73 @@
+"""
+Bloom filter for the Bank Data API
+Compact probabilistic membership test used to reject unknown PSNs before the exact index is consulted
+"""
+
+from typing import Any, Dict, Iterable
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for a capacity and target false-positive rate"""
+
+    def __init__(self, capacity: int, fp_rate: float = 0.01):
+        """Allocate a filter that stays under fp_rate with up to capacity items"""
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1")
+        capacity = max(capacity, 1)
+        self._num_bits = max(8, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self._num_hashes = max(1, int(round(self._num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self._num_bits + 7) // 8)
+        self._capacity = capacity
+        self._fp_rate = fp_rate
+        self._count = 0
+
+    @classmethod
+    def from_items(cls, items: Iterable[str], fp_rate: float = 0.01) -> 'BloomFilter':
+        """Build a filter sized for exactly the given items"""
+        items = list(items)
+        bloom = cls(len(items), fp_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _positions(self, item: str):
+        # Kirsch-Mitzenmacher double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        num_bits = self._num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self._num_hashes)]
+
+    def add(self, item: str):
+        """Add an item to the filter"""
+        bits = self._bits
+        for position in self._positions(item):
+            bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def __contains__(self, item: str) -> bool:
+        """False means definitely absent, True means possibly present"""
+        bits = self._bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self._count
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and accuracy figures for the admin API"""
+        # Expected false-positive rate for the number of items actually added
+        expected_fp = (1 - math.exp(-self._num_hashes * self._count / self._num_bits)) ** self._num_hashes
+        return {
+            'items': self._count,
+            'capacity': self._capacity,
+            'bits': self._num_bits,
+            'hash_functions': self._num_hashes,
+            'memory_bytes': len(self._bits),
+            'target_fp_rate': self._fp_rate,
+            'expected_fp_rate': round(expected_fp, 6)
+        }
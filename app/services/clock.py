@@ -0,0 +1,150 @@
+"""
+Clock service for the Bank Data API
+Provides the time source used for session expiry, rate limiting and consent scheduling
+"""
+
+from typing import Callable, List, Optional
+from datetime import datetime
+from app.config import get_logger, get_config, LazySingleton
+import math
+import threading
+import time
+
+logger = get_logger('services.clock')
+
+# Upper bound on the virtual clock speed, so that timestamps stay representable as datetimes for years of runtime
+MAX_SPEED = 1e6
+
+
+def _check_speed(speed: float):
+    if not math.isfinite(speed) or speed < 0 or speed > MAX_SPEED:
+        raise ValueError(f"Clock speed must be between 0 and {MAX_SPEED:g}, got {speed}")
+
+
+class SystemClock:
+    """Clock backed by the wall clock"""
+
+    def now(self) -> datetime:
+        """Current time as a datetime"""
+        return datetime.now()
+
+    def time(self) -> float:
+        """Current time as a POSIX timestamp"""
+        return time.time()
+
+    def sleep(self, seconds: float):
+        """Block the calling thread for the given number of clock seconds"""
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def to_real_seconds(self, seconds: float) -> Optional[float]:
+        """Convert a clock duration to a wall-clock duration (None means wait for a notification)"""
+        return max(seconds, 0)
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Register a callback invoked when the clock jumps (never happens for the system clock)"""
+        pass
+
+    def describe(self) -> dict:
+        """Describe the clock for the admin API"""
+        return {'mode': 'system', 'now': self.now().isoformat()}
+
+
+class VirtualClock:
+    """
+    Clock that runs at a multiple of wall-clock speed and can be advanced manually.
+    A speed of 0 freezes the clock so that it only moves through advance().
+    """
+
+    def __init__(self, speed: float = 1.0, start: Optional[float] = None):
+        """Initialize the virtual clock at the given timestamp (defaults to now)"""
+        _check_speed(speed)
+        self._speed = speed
+        self._base = time.time() if start is None else start
+        self._mono_base = time.monotonic()
+        self._cond = threading.Condition()
+        self._listeners: List[Callable[[], None]] = []
+
+    def _time_locked(self) -> float:
+        return self._base + (time.monotonic() - self._mono_base) * self._speed
+
+    def now(self) -> datetime:
+        """Current virtual time as a datetime"""
+        return datetime.fromtimestamp(self.time())
+
+    def time(self) -> float:
+        """Current virtual time as a POSIX timestamp"""
+        with self._cond:
+            return self._time_locked()
+
+    def sleep(self, seconds: float):
+        """Block until the virtual clock has moved forward by the given number of seconds"""
+        with self._cond:
+            target = self._time_locked() + seconds
+            while True:
+                remaining = target - self._time_locked()
+                if remaining <= 0:
+                    return
+                self._cond.wait(self.to_real_seconds(remaining))
+
+    def to_real_seconds(self, seconds: float) -> Optional[float]:
+        """Convert a virtual duration to a wall-clock duration (None while the clock is frozen)"""
+        if self._speed == 0:
+            return None
+        return max(seconds, 0) / self._speed
+
+    def advance(self, seconds: float) -> datetime:
+        """Move the virtual clock forward and wake everything waiting on it"""
+        if not math.isfinite(seconds) or seconds < 0:
+            raise ValueError(f"Seconds must be a finite, non-negative number, got {seconds}")
+        with self._cond:
+            try:
+                datetime.fromtimestamp(self._time_locked() + seconds)
+            except (OverflowError, OSError, ValueError):
+                raise ValueError(f"Advancing by {seconds} seconds leaves the representable time range")
+            self._base += seconds
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        logger.info(f"Virtual clock advanced by {seconds} seconds")
+        for callback in listeners:
+            callback()
+        return self.now()
+
+    def set_speed(self, speed: float):
+        """Change the speed multiplier without moving the current virtual time"""
+        _check_speed(speed)
+        with self._cond:
+            self._base = self._time_locked()
+            self._mono_base = time.monotonic()
+            self._speed = speed
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        logger.info(f"Virtual clock speed set to {speed}x")
+        for callback in listeners:
+            callback()
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Register a callback invoked whenever the clock is advanced or its speed changes"""
+        with self._cond:
+            self._listeners.append(callback)
+
+    def describe(self) -> dict:
+        """Describe the clock for the admin API"""
+        return {'mode': 'virtual', 'speed': self._speed, 'now': self.now().isoformat()}
+
+
+def create_clock():
+    """Create the clock selected by the CLOCK_MODE setting"""
+    config = get_config()
+
+    if config.CLOCK_MODE == 'virtual':
+        logger.info(f"Using virtual clock at {config.CLOCK_SPEED}x speed")
+        return VirtualClock(speed=config.CLOCK_SPEED)
+
+    if config.CLOCK_MODE != 'system':
+        logger.warning(f"Unknown CLOCK_MODE '{config.CLOCK_MODE}', falling back to system clock")
+    return SystemClock()
+
+
+# Global clock instance, created on first use
+get_clock = LazySingleton(create_clock)
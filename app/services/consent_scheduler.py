@@ -0,0 +1,131 @@
+"""
+Consent scheduler for the Bank Data API
+Runs delayed consent steps on a single timer thread and a shared worker pool
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from app.config import get_logger, get_config, LazySingleton
+from app.services.clock import get_clock
+import heapq
+import itertools
+import threading
+
+logger = get_logger('services.consent_scheduler')
+
+
+class ConsentScheduler:
+    """Schedules callbacks at a due time measured on the application clock"""
+
+    def __init__(self, clock, max_workers: Optional[int] = None, name: str = 'consent'):
+        """Initialize the scheduler; the timer thread is started on first use"""
+        config = get_config()
+        self._name = name
+
+        self._clock = clock
+        self._queue: List[Tuple[float, int, Optional[str], Callable[[], None]]] = []
+        self._due: Dict[str, Tuple[float, int]] = {}  # key -> (due time, sequence) of the live entry
+        self._stale = 0  # Heap entries left behind by cancel() or rescheduling
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._max_workers = max_workers or config.CONSENT_WORKER_THREADS
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix=name)
+        self._latency_ewma = 0.0  # Smoothed delay between a task's due time and the moment it starts running
+
+        clock.add_listener(self._wake)
+        logger.info(f"ConsentScheduler '{name}' initialized with {self._max_workers} worker threads")
+
+    def schedule(self, delay_seconds: float, callback: Callable[[], None], key: Optional[str] = None) -> float:
+        """
+        Run callback after delay_seconds of clock time.
+        Scheduling with a key replaces any pending task with the same key.
+        Returns the due time as a clock timestamp.
+        """
+        with self._cond:
+            due = self._clock.time() + delay_seconds
+            seq = next(self._seq)
+            heapq.heappush(self._queue, (due, seq, key, callback))
+            if key is not None:
+                if key in self._due:
+                    self._stale += 1
+                self._due[key] = (due, seq)
+            self._ensure_thread()
+            self._cond.notify()
+        return due
+
+    def cancel(self, key: str) -> bool:
+        """Cancel the pending task for a key"""
+        with self._cond:
+            if self._due.pop(key, None) is None:
+                return False
+            self._stale += 1
+            if self._stale > 64 and self._stale * 2 > len(self._queue):
+                # Mostly dead entries: rebuild rather than carry them until their due time
+                self._queue = [entry for entry in self._queue
+                               if entry[2] is None or self._due.get(entry[2]) == (entry[0], entry[1])]
+                heapq.heapify(self._queue)
+                self._stale = 0
+            return True
+
+    def due_time(self, key: str) -> Optional[float]:
+        """Clock timestamp at which the pending task for a key will run"""
+        with self._cond:
+            entry = self._due.get(key)
+            return entry[0] if entry else None
+
+    def pending_count(self) -> int:
+        """Number of keyed tasks waiting to run"""
+        with self._cond:
+            return len(self._due)
+
+    def queue_latency(self) -> float:
+        """Smoothed time, in clock seconds, that due tasks wait for a worker thread"""
+        return self._latency_ewma
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=f'{self._name}-scheduler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._queue:
+                        self._cond.wait()
+                        continue
+                    due, seq, key, callback = self._queue[0]
+                    if key is not None and self._due.get(key) != (due, seq):
+                        # Cancelled or superseded by a later schedule() for the same key
+                        heapq.heappop(self._queue)
+                        self._stale = max(self._stale - 1, 0)
+                        continue
+                    remaining = due - self._clock.time()
+                    if remaining <= 0:
+                        heapq.heappop(self._queue)
+                        if key is not None:
+                            del self._due[key]
+                        break
+                    self._cond.wait(self._clock.to_real_seconds(remaining))
+
+            self._executor.submit(self._invoke, callback, due)
+
+    def _invoke(self, callback: Callable[[], None], due: float):
+        lateness = max(self._clock.time() - due, 0.0)
+        self._latency_ewma += 0.2 * (lateness - self._latency_ewma)
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Scheduled {self._name} task failed: {e}")
+
+
+# Global consent scheduler instance, created on first use
+get_consent_scheduler = LazySingleton(lambda: ConsentScheduler(get_clock()))
+
+# Session expiry timers run apart from consent steps, so their lateness never counts as consent queue latency
+get_expiry_scheduler = LazySingleton(lambda: ConsentScheduler(get_clock(), max_workers=1, name='session-expiry'))
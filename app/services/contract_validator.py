@@ -0,0 +1,251 @@
+"""
+Contract validator for the Bank Data API
+Compiles bank_data_api.yaml once into validator functions and checks requests and sampled responses against it
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+from app.config import get_logger, get_config, LazySingleton
+import json
+import os
+import random
+import re
+import threading
+
+logger = get_logger('services.contract')
+
+SPEC_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'bank_data_api.yaml'
+)
+
+# A compiled schema takes a value and returns a list of violation messages (empty when valid)
+Validator = Callable[[Any], List[str]]
+
+_TYPE_CHECKS = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+}
+
+
+def _is_date_time(value: str) -> bool:
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return True
+    except ValueError:
+        return False
+
+
+def compile_schema(schema: Dict[str, Any], components: Dict[str, Any], path: str = '$') -> Validator:
+    """Turn an OpenAPI schema object into a validator function, resolving $ref eagerly"""
+    if '$ref' in schema:
+        name = schema['$ref'].rsplit('/', 1)[-1]
+        return compile_schema(components[name], components, path)
+
+    checks: List[Validator] = []
+
+    schema_type = schema.get('type')
+    if schema_type in _TYPE_CHECKS:
+        type_check = _TYPE_CHECKS[schema_type]
+        checks.append(lambda v: [] if type_check(v) else [f"{path}: expected {schema_type}, got {type(v).__name__}"])
+
+    if 'enum' in schema:
+        allowed = schema['enum']
+        checks.append(lambda v: [] if v in allowed else [f"{path}: {v!r} not in {allowed}"])
+
+    if 'pattern' in schema:
+        pattern = re.compile(schema['pattern'])
+        checks.append(lambda v: [] if not isinstance(v, str) or pattern.search(v)
+                      else [f"{path}: {v!r} does not match {pattern.pattern}"])
+
+    if schema.get('format') == 'date-time':
+        checks.append(lambda v: [] if not isinstance(v, str) or _is_date_time(v)
+                      else [f"{path}: {v!r} is not a date-time"])
+
+    if 'minimum' in schema:
+        minimum = schema['minimum']
+        checks.append(lambda v: [] if not _TYPE_CHECKS['number'](v) or v >= minimum
+                      else [f"{path}: {v} is below minimum {minimum}"])
+
+    if 'maximum' in schema:
+        maximum = schema['maximum']
+        checks.append(lambda v: [] if not _TYPE_CHECKS['number'](v) or v <= maximum
+                      else [f"{path}: {v} is above maximum {maximum}"])
+
+    required = tuple(schema.get('required', ()))
+    if required:
+        checks.append(lambda v: [] if not isinstance(v, dict)
+                      else [f"{path}: missing required property {name}" for name in required if name not in v])
+
+    properties = {name: compile_schema(sub, components, f"{path}.{name}")
+                  for name, sub in schema.get('properties', {}).items()}
+    if properties:
+        def check_properties(v):
+            if not isinstance(v, dict):
+                return []
+            errors = []
+            for name, validator in properties.items():
+                if name in v:
+                    errors.extend(validator(v[name]))
+            return errors
+        checks.append(check_properties)
+
+    if 'items' in schema:
+        item_validator = compile_schema(schema['items'], components, f"{path}[]")
+        checks.append(lambda v: [] if not isinstance(v, list)
+                      else [error for item in v for error in item_validator(item)])
+
+    type_first = schema_type in _TYPE_CHECKS
+    rest = checks[1:] if type_first else checks
+
+    def validate(value: Any) -> List[str]:
+        if type_first:
+            errors = checks[0](value)
+            if errors:
+                return errors  # Wrong type, the remaining checks would only add noise
+        errors = []
+        for check in rest:
+            errors.extend(check(value))
+        return errors
+
+    return validate
+
+
+class Operation:
+    """Compiled request and response contract of one spec operation"""
+
+    def __init__(self, operation_id: str, path_regex, parameters: Dict[Tuple[str, str], Validator],
+                 responses: Dict[str, Optional[Validator]]):
+        self.operation_id = operation_id
+        self.path_regex = path_regex
+        self.parameters = parameters  # (location, name) -> validator
+        self.responses = responses  # status code -> body validator (None when the spec defines no JSON body)
+
+
+class ContractValidator:
+    """Validates requests and a sample of responses against the compiled specification"""
+
+    def __init__(self, spec: Dict[str, Any], response_sample_rate: float = 0.01):
+        """Compile every operation in the spec"""
+        components = spec.get('components', {}).get('schemas', {})
+        self._operations: Dict[str, List[Operation]] = {}
+        self._response_sample_rate = response_sample_rate
+        self._lock = threading.Lock()
+        self._counters = {
+            'requests_checked': 0,
+            'request_violations': 0,
+            'responses_checked': 0,
+            'response_violations': 0,
+        }
+        self._violations_by_operation: Dict[str, int] = {}
+
+        for spec_path, methods in spec.get('paths', {}).items():
+            path_regex = re.compile('^' + re.sub(r'\{([^}]+)\}', r'(?P<\1>[^/]+)', spec_path) + '$')
+            for method, operation in methods.items():
+                parameters = {
+                    (param['in'], param['name'].lower() if param['in'] == 'header' else param['name']):
+                        compile_schema(param.get('schema', {}), components, f"{param['in']}:{param['name']}")
+                    for param in operation.get('parameters', [])
+                }
+                responses = {}
+                for status, response in operation.get('responses', {}).items():
+                    body_schema = response.get('content', {}).get('application/json', {}).get('schema')
+                    responses[str(status)] = compile_schema(body_schema, components, 'body') if body_schema else None
+                self._operations.setdefault(method.upper(), []).append(
+                    Operation(operation.get('operationId', spec_path), path_regex, parameters, responses)
+                )
+
+        logger.info(f"Compiled {sum(len(ops) for ops in self._operations.values())} operations from the API spec, "
+                    f"response sample rate {response_sample_rate}")
+
+    def match(self, method: str, path: str) -> Tuple[Optional[Operation], Dict[str, str]]:
+        """Find the operation for a request path, returning it with the extracted path parameters"""
+        for operation in self._operations.get(method.upper(), []):
+            m = operation.path_regex.match(path)
+            if m:
+                return operation, m.groupdict()
+        return None, {}
+
+    def check_request(self, method: str, path: str, headers) -> List[str]:
+        """Validate path parameters and headers of a request, counting and logging violations"""
+        operation, path_params = self.match(method, path)
+        if operation is None:
+            return []
+
+        errors = []
+        for (location, name), validator in operation.parameters.items():
+            if location == 'path':
+                errors.extend(validator(path_params.get(name)))
+            elif location == 'header' and headers.get(name) is not None:
+                errors.extend(validator(headers.get(name)))
+
+        self._record('request', operation.operation_id, errors)
+        return errors
+
+    def should_sample_response(self) -> bool:
+        """Decide whether the current response gets validated"""
+        return self._response_sample_rate >= 1 or random.random() < self._response_sample_rate
+
+    def check_response(self, method: str, path: str, status_code: int, get_body: Callable[[], bytes],
+                       is_json: bool) -> List[str]:
+        """
+        Validate the status code and JSON body of a response, counting and logging violations.
+        get_body is only called for operations whose response has a JSON schema.
+        """
+        operation, _ = self.match(method, path)
+        if operation is None:
+            return []
+
+        status = str(status_code)
+        errors = []
+        if status not in operation.responses:
+            errors.append(f"status {status} is not documented")
+        else:
+            validator = operation.responses[status]
+            if validator is not None:
+                if not is_json:
+                    errors.append("body: expected application/json")
+                else:
+                    try:
+                        errors.extend(validator(json.loads(get_body())))
+                    except ValueError as e:
+                        errors.append(f"body: invalid JSON ({e})")
+
+        self._record('response', operation.operation_id, errors)
+        return errors
+
+    def _record(self, kind: str, operation_id: str, errors: List[str]):
+        with self._lock:
+            self._counters[f'{kind}s_checked'] += 1
+            if errors:
+                self._counters[f'{kind}_violations'] += 1
+                self._violations_by_operation[operation_id] = self._violations_by_operation.get(operation_id, 0) + 1
+        if errors:
+            logger.warning(f"Contract violation in {kind} of {operation_id}: {'; '.join(errors)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the admin API"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['response_sample_rate'] = self._response_sample_rate
+            stats['violations_by_operation'] = dict(self._violations_by_operation)
+            return stats
+
+
+def _create_contract_validator() -> Optional[ContractValidator]:
+    config = get_config()
+    if not config.CONTRACT_VALIDATION_ENABLED:
+        return None
+
+    import yaml  # Only needed when contract validation is enabled
+    with open(SPEC_FILE_PATH, 'r', encoding='utf-8') as f:
+        spec = yaml.safe_load(f)
+    return ContractValidator(spec, config.CONTRACT_RESPONSE_SAMPLE_RATE)
+
+
+# Global contract validator instance, created on first use (None unless CONTRACT_VALIDATION_ENABLED is set)
+get_contract_validator = LazySingleton(_create_contract_validator)
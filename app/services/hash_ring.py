@@ -0,0 +1,100 @@
+"""
+Consistent hashing for running the Bank Data API across several nodes
+Places PSNs on a ring of virtual nodes and tags session IDs with the node that created them
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional
+import bisect
+import hashlib
+
+# Session IDs stay valid UUIDs: the owner tag replaces the first 4 hex digits of the last group
+_TAG_OFFSET = 24
+_TAG_LENGTH = 4
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def node_tag(node_id: str) -> str:
+    """Four upper-case hex digits identifying a node inside the session IDs it creates"""
+    return hashlib.blake2b(node_id.encode('utf-8'), digest_size=2).hexdigest().upper()
+
+
+def tag_session_id(session_id: str, tag: str) -> str:
+    """Stamp a node tag into a UUID-formatted session ID"""
+    return session_id[:_TAG_OFFSET] + tag + session_id[_TAG_OFFSET + _TAG_LENGTH:]
+
+
+def session_owner_tag(session_id: str) -> Optional[str]:
+    """Node tag of a session ID, or None when it is too short to carry one"""
+    if len(session_id) < _TAG_OFFSET + _TAG_LENGTH:
+        return None
+    return session_id[_TAG_OFFSET:_TAG_OFFSET + _TAG_LENGTH].upper()
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes; adding or removing a node only moves its share of keys"""
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 100):
+        """Build the ring; every node gets vnodes points"""
+        self._vnodes = vnodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self._nodes: List[str] = []
+        for node in nodes:
+            self.add_node(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def add_node(self, node: str):
+        """Insert a node's points into the ring"""
+        if node in self._nodes:
+            return
+        self._nodes.append(node)
+        for i in range(self._vnodes):
+            point = _hash(f"{node}#{i}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove_node(self, node: str):
+        """Remove a node's points from the ring"""
+        if node not in self._nodes:
+            return
+        self._nodes.remove(node)
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def lookup(self, key: str, accept: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        Node owning a key: the first point clockwise from the key's hash.
+        With accept, nodes it rejects (e.g. unhealthy ones) are skipped in ring order.
+        Returns None when no node qualifies.
+        """
+        if not self._points:
+            return None
+        start = bisect.bisect(self._points, _hash(key))
+        tried = set()
+        for offset in range(len(self._points)):
+            node = self._owners[(start + offset) % len(self._points)]
+            if node in tried:
+                continue
+            if accept is None or accept(node):
+                return node
+            tried.add(node)
+            if len(tried) == len(self._nodes):
+                break
+        return None
+
+    def distribution(self, keys: Iterable[str]) -> Dict[str, int]:
+        """Count how many of the given keys each node owns"""
+        counts = {node: 0 for node in self._nodes}
+        for key in keys:
+            node = self.lookup(key)
+            if node is not None:
+                counts[node] += 1
+        return counts
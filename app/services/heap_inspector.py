@@ -0,0 +1,173 @@
+"""
+Heap inspector for the Bank Data API
+Takes and diffs tracemalloc snapshots, counts live objects by type and samples process RSS over time
+"""
+
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from collections import Counter, OrderedDict, deque
+from app.config import get_logger, get_config, LazySingleton
+import gc
+import itertools
+import os
+import threading
+import time
+import tracemalloc
+
+logger = get_logger('services.heap_inspector')
+
+# Types counted individually in object_counts(), by class name
+TRACKED_TYPES = ('Session', 'BankData', 'Thread')
+
+# Allocations made by tracemalloc itself and the import system are noise in every report
+_NOISE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where it cannot be read"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource  # Unix only; ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def _format_stat(stat) -> Dict[str, Any]:
+    frame = stat.traceback[0]
+    entry = {
+        'site': f"{frame.filename}:{frame.lineno}",
+        'size_kb': round(stat.size / 1024, 1),
+        'count': stat.count,
+    }
+    if hasattr(stat, 'size_diff'):
+        entry['size_diff_kb'] = round(stat.size_diff / 1024, 1)
+        entry['count_diff'] = stat.count_diff
+    return entry
+
+
+class HeapInspector:
+    """
+    Keeps a few named tracemalloc snapshots for diffing and a ring buffer of RSS samples.
+    Gauges registered by other modules (e.g. rate-limit store sizes) are included in every report.
+    """
+
+    def __init__(self, trace_frames: int = 10, rss_interval_seconds: float = 10.0, rss_history: int = 360,
+                 max_snapshots: int = 5):
+        """Start tracing allocations and sampling RSS"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(trace_frames)
+        self._snapshots: 'OrderedDict[int, Tuple[float, str, tracemalloc.Snapshot]]' = OrderedDict()
+        self._max_snapshots = max_snapshots
+        self._snapshot_ids = itertools.count(1)
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+        self._rss: Deque[Tuple[float, int]] = deque(maxlen=rss_history)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self._sample_rss()
+        threading.Thread(target=self._run_rss_sampler, args=(rss_interval_seconds,),
+                         name='heap-rss-sampler', daemon=True).start()
+        logger.info(f"Heap inspector tracing {trace_frames} frames, sampling RSS every {rss_interval_seconds}s")
+
+    def register_gauge(self, name: str, gauge: Callable[[], Any]):
+        """Add a named callable reported by object_counts()"""
+        self._gauges[name] = gauge
+
+    def _sample_rss(self):
+        rss = current_rss_bytes()
+        if rss is not None:
+            self._rss.append((time.time(), rss))
+
+    def _run_rss_sampler(self, interval_seconds: float):
+        while not self._stop.wait(interval_seconds):
+            self._sample_rss()
+
+    def take_snapshot(self, label: str = '') -> int:
+        """Capture the traced heap and keep it for diffs; the oldest snapshot is dropped beyond max_snapshots"""
+        snapshot = tracemalloc.take_snapshot().filter_traces(_NOISE_FILTERS)
+        with self._lock:
+            snapshot_id = next(self._snapshot_ids)
+            self._snapshots[snapshot_id] = (time.time(), label, snapshot)
+            while len(self._snapshots) > self._max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def _snapshot(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        with self._lock:
+            if snapshot_id not in self._snapshots:
+                raise KeyError(f"Unknown snapshot {snapshot_id}")
+            return self._snapshots[snapshot_id][2]
+
+    def top_allocations(self, snapshot_id: int, limit: int = 20, group_by: str = 'lineno') -> List[Dict[str, Any]]:
+        """Largest allocation sites of a snapshot ('lineno' or 'filename')"""
+        stats = self._snapshot(snapshot_id).statistics(group_by)
+        return [_format_stat(stat) for stat in stats[:limit]]
+
+    def diff(self, from_id: int, to_id: int, limit: int = 20, group_by: str = 'lineno') -> List[Dict[str, Any]]:
+        """Allocation sites that grew (or shrank) the most between two snapshots"""
+        stats = self._snapshot(to_id).compare_to(self._snapshot(from_id), group_by)
+        return [_format_stat(stat) for stat in stats[:limit]]
+
+    def snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{'id': snapshot_id, 'taken_at': taken_at, 'label': label}
+                    for snapshot_id, (taken_at, label, _) in self._snapshots.items()]
+
+    def object_counts(self, top: int = 15) -> Dict[str, Any]:
+        """
+        Live object counts from the garbage collector: the tracked types, the most numerous types overall,
+        threads by name prefix and the registered gauges. Walks every tracked object, so it takes a moment.
+        """
+        counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+        threads = Counter(thread.name.rsplit('_', 1)[0].rsplit('-', 1)[0] for thread in threading.enumerate())
+        gauges = {}
+        for name, gauge in self._gauges.items():
+            try:
+                gauges[name] = gauge()
+            except Exception as e:
+                gauges[name] = f"error: {e}"
+        return {
+            'tracked': {name: counts.get(name, 0) for name in TRACKED_TYPES},
+            'top_types': dict(counts.most_common(top)),
+            'threads': {'total': threading.active_count(), 'by_name': dict(threads)},
+            'gauges': gauges
+        }
+
+    def memory(self) -> Dict[str, Any]:
+        """Traced heap size and the RSS history"""
+        traced, peak = tracemalloc.get_traced_memory()
+        return {
+            'traced_kb': round(traced / 1024, 1),
+            'traced_peak_kb': round(peak / 1024, 1),
+            'rss_bytes': current_rss_bytes(),
+            'rss_history': [{'at': at, 'rss_bytes': rss} for at, rss in self._rss]
+        }
+
+    def stop(self):
+        self._stop.set()
+        tracemalloc.stop()
+
+
+def _create_heap_inspector() -> Optional[HeapInspector]:
+    config = get_config()
+    if not config.HEAP_INSPECTOR_ENABLED:
+        return None
+    return HeapInspector(
+        trace_frames=config.HEAP_TRACE_FRAMES,
+        rss_interval_seconds=config.HEAP_RSS_SAMPLE_SECONDS,
+        rss_history=config.HEAP_RSS_HISTORY
+    )
+
+
+# Global heap inspector instance, created on first use (None unless HEAP_INSPECTOR_ENABLED is set)
+get_heap_inspector = LazySingleton(_create_heap_inspector)
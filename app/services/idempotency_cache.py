@@ -0,0 +1,105 @@
+"""
+Idempotency cache for the Bank Data API
+Replays the original session response for retried data requests carrying the same X-Request-ID
+"""
+
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+from app.config import get_logger, get_config, LazySingleton
+from app.services.clock import get_clock
+import threading
+
+logger = get_logger('services.idempotency')
+
+
+class IdempotencyCache:
+    """Bounded LRU cache with a TTL, measured on the application clock"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock=None):
+        """Initialize an empty cache"""
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()  # key -> (stored at, value)
+        self._in_flight: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock or get_clock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Return the cached value for key, or call factory() and cache its result.
+        Concurrent callers with the same key wait for the first one instead of calling factory() again.
+        Returns (value, replayed).
+        """
+        while True:
+            with self._lock:
+                value = self._lookup_locked(key)
+                if value is not None:
+                    self._hits += 1
+                    return value, True
+                waiter = self._in_flight.get(key)
+                if waiter is None:
+                    self._misses += 1
+                    done = self._in_flight[key] = threading.Event()
+                    break
+            # Another request with the same key is being processed; retry once it finishes
+            waiter.wait()
+
+        try:
+            value = factory()
+            if value is not None:
+                self.put(key, value)
+            return value, False
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            done.set()
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (self._clock.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _lookup_locked(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self._clock.time() - stored_at >= self._ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the admin API"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self._max_entries,
+                'ttl_seconds': self._ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def _create_idempotency_cache() -> Optional[IdempotencyCache]:
+    config = get_config()
+    if not config.IDEMPOTENCY_ENABLED:
+        return None
+    logger.info(f"Idempotency cache enabled: {config.IDEMPOTENCY_MAX_ENTRIES} entries, "
+                f"{config.IDEMPOTENCY_TTL_SECONDS} second window")
+    return IdempotencyCache(config.IDEMPOTENCY_MAX_ENTRIES, config.IDEMPOTENCY_TTL_SECONDS)
+
+
+# Global idempotency cache instance, created on first use (None unless IDEMPOTENCY_ENABLED is set)
+get_idempotency_cache = LazySingleton(_create_idempotency_cache)
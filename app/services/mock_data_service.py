@@ -3,13 +3,16 @@ Mock data service for simulating bank data
 In a real implementation, this would connect to actual bank systems
 """
 
-from typing import Optional
+from typing import Optional, Dict, Any
 from app.models import BankData
+from app.services.bloom_filter import BloomFilter
+import csv
 import random
+import time
 
 # Import logger after other imports to avoid circular import issues
 try:
-    from app.config import get_logger
+    from app.config import get_logger, get_config, LazySingleton
     logger = get_logger('services.mock_data')
     logger.debug("Mock data service logger initialized")
 except Exception as e:
@@ -22,8 +25,17 @@ except Exception as e:
 class MockBankDataService:
     """Mock service that simulates bank data retrieval"""
     
-    def __init__(self):
-        """Initialize with some mock data for known PSNs"""
+    def __init__(self, data_file: Optional[str] = None, fp_rate: Optional[float] = None, backend=None):
+        """
+        Initialize with some mock data for known PSNs, optionally extended from a CSV dataset.
+        fp_rate sets the false-positive rate of the Bloom filter that keeps unknown PSNs away from the backend
+        (0 disables it; it needs a backend that can list its PSNs, i.e. SQLite).
+        backend (see app.services.bank_data_backend) serves PSNs that are not in the local data.
+        """
+        config = get_config()
+        data_file = data_file if data_file is not None else config.MOCK_DATA_FILE
+        fp_rate = fp_rate if fp_rate is not None else config.PSN_FILTER_FP_RATE
+        
         # Mock database of citizens with banking data
         self._mock_data = {
             "1234567890": BankData(
@@ -51,10 +63,61 @@ class MockBankDataService:
         
         # PSNs that will simulate long processing (stay PENDING longer)
         self._slow_processing_psns = {"3333333333"}
+        
+        self.data_file = data_file or None
+        if data_file:
+            self._load_dataset(data_file)
+        
+        self._backend = backend
+        
+        # Bloom filter over the backend's PSNs so unknown PSNs are rejected without a backend round trip.
+        # Local PSNs are an in-memory set lookup, far cheaper than the filter, so they are not included.
+        self._psn_filter: Optional[BloomFilter] = None
+        self._filter_rejections = 0
+        if fp_rate:
+            self._psn_filter = self._build_psn_filter(fp_rate)
+    
+    def _build_psn_filter(self, fp_rate: float) -> Optional[BloomFilter]:
+        psns = self._backend.list_psns() if self._backend is not None else None
+        if psns is None:
+            logger.warning("PSN_FILTER_FP_RATE is set but ignored: the filter needs a SQLite backend to build from")
+            return None
+        started = time.perf_counter()
+        psn_filter = BloomFilter.from_items(psns, fp_rate)
+        logger.info(f"Built PSN filter for {len(psn_filter)} backend PSNs "
+                    f"({psn_filter.stats()['memory_bytes']} bytes) "
+                    f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return psn_filter
+    
+    def _load_dataset(self, data_file: str):
+        """
+        Load citizens from a CSV file with the BankData field names as columns and a PSN column.
+        An optional Consent column marks rows as 'deny' or 'slow'.
+        """
+        loaded = 0
+        with open(data_file, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                psn = row['PSN'].strip()
+                behavior = (row.get('Consent') or '').strip().lower()
+                if behavior == 'deny':
+                    self._denied_psns.add(psn)
+                    continue
+                if behavior == 'slow':
+                    self._slow_processing_psns.add(psn)
+                self._mock_data[psn] = BankData.from_dict(row)
+                loaded += 1
+        logger.info(f"Loaded {loaded} citizens from {data_file}")
     
     def has_data_for_psn(self, psn: str) -> bool:
         """Check if the bank has data for this PSN"""
-        return psn in self._mock_data or psn in self._denied_psns or psn in self._slow_processing_psns
+        if psn in self._mock_data or psn in self._denied_psns or psn in self._slow_processing_psns:
+            return True
+        if self._backend is None:
+            return False
+        if self._psn_filter is not None and psn not in self._psn_filter:
+            self._filter_rejections += 1
+            return False
+        return self._backend.fetch(psn) is not None
     
     def will_deny_consent(self, psn: str) -> bool:
         """Check if this PSN will deny consent"""
@@ -68,11 +131,19 @@ class MockBankDataService:
         """
         Retrieve banking data for a PSN.
         Returns None if no data available or consent not given.
+        Raises BackendUnavailableError when the backend cannot be reached.
         """
         if psn in self._mock_data:
             logger.info(f"Retrieved banking data for PSN {psn}")
             return self._mock_data[psn]
         
+        if self._backend is not None:
+            if psn in self._denied_psns:
+                return None
+            logger.info(f"Fetching banking data for PSN {psn} from backend")
+            # Usually cached by the has_data_for_psn check that started the session
+            return self._backend.fetch(psn, follow_up=True)
+        
         # For demo purposes, generate random data for unknown but valid PSNs
         if psn not in self._denied_psns:
             logger.info(f"Generating mock data for PSN {psn}")
@@ -85,7 +156,24 @@ class MockBankDataService:
         
         logger.info(f"No data available for PSN {psn}")
         return None
+    
+    def backend_stats(self) -> Optional[Dict[str, Any]]:
+        """Backend cache and latency figures for the admin API"""
+        return self._backend.stats() if self._backend is not None else None
+    
+    def psn_filter_stats(self) -> Optional[Dict[str, Any]]:
+        """Bloom filter footprint and rejection count for the admin API"""
+        if self._psn_filter is None:
+            return None
+        stats = self._psn_filter.stats()
+        stats['rejections'] = self._filter_rejections
+        return stats
+
+
+def _create_mock_bank_service() -> MockBankDataService:
+    from app.services.bank_data_backend import get_bank_data_backend
+    return MockBankDataService(backend=get_bank_data_backend())
 
 
-# Global instance
-mock_bank_service = MockBankDataService()
\ No newline at end of file
+# Global instance, created on first use
+get_mock_bank_service = LazySingleton(_create_mock_bank_service)
\ No newline at end of file
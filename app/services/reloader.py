@@ -0,0 +1,177 @@
+"""
+Hot reload for the Bank Data API
+Rebuilds configuration, datasets and the bank registry off the request path and swaps them in by reference
+"""
+
+from typing import Any, Dict, List, Optional
+from app.config import get_logger, get_config, load_config, swap_config, env_file_path, LazySingleton
+import os
+import threading
+import time
+
+logger = get_logger('services.reloader')
+
+# Settings read when they are used, so a reload takes effect immediately; all others need a restart
+RELOADABLE_SETTINGS = {
+    'SESSION_TTL_MINUTES', 'RATE_LIMIT_WINDOW_SECONDS', 'RATE_LIMIT_MAX_REQUESTS',
+    'MOCK_DATA_FILE', 'PSN_FILTER_FP_RATE', 'BANKS_CONFIG_FILE', 'RELOAD_WATCH_SECONDS',
+}
+
+
+def _settings(config) -> Dict[str, Any]:
+    return {name: value for name, value in vars(config).items() if name.isupper()}
+
+
+class Reloader:
+    """
+    Copy-on-write reload: the new config, data services and registry are built while requests keep
+    being served from the old ones, then each shared reference is replaced in one assignment.
+    A request that already resolved its bank finishes against the old version; sessions live in session
+    managers that are carried over, so none are lost.
+    """
+
+    def __init__(self):
+        """Initialize the reloader; watching starts with start_watching()"""
+        self._lock = threading.Lock()  # One reload at a time
+        self._version = 1
+        self._reloads = 0
+        self._failures = 0
+        self._last: Optional[Dict[str, Any]] = None
+        self._mtimes: Dict[str, Optional[float]] = {}
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def reload(self, trigger: str = 'admin') -> Dict[str, Any]:
+        """Build and swap in a new version; on failure the running version is kept and the error reported"""
+        from app.services.mock_data_service import MockBankDataService, get_mock_bank_service
+        from app.services.bank_registry import build_bank_registry, get_bank_registry
+        from app.services.bank_data_backend import get_bank_data_backend
+
+        with self._lock:
+            started = time.perf_counter()
+            old_config = get_config()
+            try:
+                new_config = load_config()
+                data_service = MockBankDataService(
+                    data_file=new_config.MOCK_DATA_FILE or '',
+                    fp_rate=new_config.PSN_FILTER_FP_RATE,
+                    backend=get_bank_data_backend()
+                )
+                registry = build_bank_registry(new_config, data_service, previous=get_bank_registry())
+            except Exception as e:
+                self._failures += 1
+                self._last = {
+                    'trigger': trigger,
+                    'ok': False,
+                    'error': str(e),
+                    'version': self._version,
+                    'build_ms': round((time.perf_counter() - started) * 1000, 3)
+                }
+                logger.error(f"Reload ({trigger}) failed, keeping version {self._version}: {e}")
+                self._remember_mtimes(old_config)  # Retry on the next edit, not on every poll
+                return dict(self._last)
+            built = time.perf_counter()
+
+            # Swap: each assignment is atomic, readers see either the old or the new object
+            swap_config(new_config)
+            get_mock_bank_service.swap(data_service)
+            get_bank_registry.swap(registry)
+            swapped = time.perf_counter()
+
+            old_settings, new_settings = _settings(old_config), _settings(new_config)
+            changed = sorted(name for name in new_settings if new_settings[name] != old_settings.get(name))
+            self._version += 1
+            self._reloads += 1
+            self._last = {
+                'trigger': trigger,
+                'ok': True,
+                'version': self._version,
+                'build_ms': round((built - started) * 1000, 3),
+                'swap_us': round((swapped - built) * 1e6, 1),
+                'changed': changed,
+                'restart_required': [name for name in changed if name not in RELOADABLE_SETTINGS],
+                'banks': sorted(registry.banks())
+            }
+            self._remember_mtimes(new_config)
+            if new_config.RELOAD_WATCH_SECONDS > 0 and self._watcher is None:
+                self._start_watcher()
+
+        logger.info(f"Reload ({trigger}) to version {self._version} built in {self._last['build_ms']} ms, "
+                    f"changed: {', '.join(changed) or 'nothing'}")
+        if self._last['restart_required']:
+            logger.warning(f"Settings only applied after a restart: {', '.join(self._last['restart_required'])}")
+        return dict(self._last)
+
+    def _watched_paths(self, config) -> List[str]:
+        paths = [env_file_path() or os.path.abspath('.env')]
+        if config.MOCK_DATA_FILE:
+            paths.append(config.MOCK_DATA_FILE)
+        if config.BANKS_CONFIG_FILE:
+            paths.append(config.BANKS_CONFIG_FILE)
+            try:
+                from app.services.bank_registry import get_bank_registry
+                paths.extend(bank.data_service.data_file for bank in get_bank_registry().banks().values()
+                             if bank.data_service.data_file)
+            except Exception:
+                pass
+        return paths
+
+    def _remember_mtimes(self, config):
+        self._mtimes = {path: _mtime(path) for path in self._watched_paths(config)}
+
+    def start_watching(self):
+        """
+        Poll the .env, dataset and banks files every RELOAD_WATCH_SECONDS and reload when one changes.
+        The interval is re-read each round, so a reload can change it; setting it to 0 stops the watcher
+        and a later reload to a positive value starts it again.
+        """
+        with self._lock:
+            self._remember_mtimes(get_config())
+            if self._watcher is None:
+                self._start_watcher()
+
+    def _start_watcher(self):
+        # Caller holds self._lock
+        self._watcher = threading.Thread(target=self._watch, name='reload-watcher', daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching {len(self._mtimes)} files for changes every {get_config().RELOAD_WATCH_SECONDS}s")
+
+    def _watch(self):
+        while True:
+            with self._lock:
+                interval = get_config().RELOAD_WATCH_SECONDS
+                if interval <= 0 or self._stop.is_set():
+                    self._watcher = None
+                    logger.info("Stopped watching files for changes")
+                    return
+            if self._stop.wait(interval):
+                continue
+            changed = [path for path, mtime in self._mtimes.items() if _mtime(path) != mtime]
+            if changed:
+                logger.info(f"Detected changes in {', '.join(changed)}")
+                self.reload(trigger='file-watch')
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Reload counters and the outcome of the last reload for the admin API"""
+        return {
+            'version': self._version,
+            'reloads': self._reloads,
+            'failures': self._failures,
+            'watching': list(self._mtimes) if self._watcher is not None else [],
+            'watch_interval_seconds': get_config().RELOAD_WATCH_SECONDS,
+            'last': dict(self._last) if self._last else None
+        }
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+# Global reloader instance, created on first use
+get_reloader = LazySingleton(Reloader)
@@ -2,10 +2,15 @@
 Session management service for the Bank Data API
 """
 
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, List, Set, Tuple
 from datetime import datetime, timedelta
 from app.models import Session, SessionStatus, BankData, generate_uuid
-from app.config import get_logger
+from app.config import get_logger, get_config, LazySingleton
+from app.services.clock import get_clock
+from app.services.consent_scheduler import get_expiry_scheduler
+from app.services.audit_log import get_audit_log, EVENT_CREATED, EVENT_SUPERSEDED
+from app.services.hash_ring import node_tag, tag_session_id
+import bisect
 import threading
 
 logger = get_logger('services.session_manager')
@@ -14,48 +19,147 @@ logger = get_logger('services.session_manager')
 class SessionManager:
     """Manages data request sessions"""
     
-    def __init__(self, default_ttl_minutes: Optional[int] = None):
-        """Initialize the session manager"""
-        from app.config import Config
-        config = Config()
+    def __init__(self, default_ttl_minutes: Optional[int] = None, clock=None, bank_id: str = 'default',
+                 audit_log=None):
+        """Initialize the session manager; lifecycle events go to the global audit log unless one is given"""
+        config = get_config()
         
         self._sessions: Dict[str, Session] = {}
         self._psn_sessions: Dict[str, str] = {}  # PSN -> session_id mapping
         self._lock = threading.Lock()
-        self._default_ttl_minutes = default_ttl_minutes or config.SESSION_TTL_MINUTES
+        self._dirty: Set[str] = set()  # session IDs changed since the last snapshot
+        self._removed: Set[str] = set()  # session IDs removed since the last snapshot
+        self._ttl_override = default_ttl_minutes  # None follows SESSION_TTL_MINUTES, which a reload may change
+        self._clock = clock or get_clock()
+        self._bank_id = bank_id
+        self._audit_log = audit_log or get_audit_log()
+        self._node_tag = node_tag(config.NODE_ID) if config.NODE_ID else None  # Lets the router find the owner
         
-        logger.info(f"SessionManager initialized with TTL: {self._default_ttl_minutes} minutes")
+        # Secondary indexes: status -> creation-time bucket -> session IDs, plus per-status counts
+        self._bucket_seconds = config.SESSION_INDEX_BUCKET_SECONDS
+        self._status_index: Dict[SessionStatus, Dict[int, Set[str]]] = {status: {} for status in SessionStatus}
+        self._status_counts: Dict[SessionStatus, int] = {status: 0 for status in SessionStatus}
         
-    def create_session(self, psn: str) -> Session:
+        logger.info(f"SessionManager initialized with TTL: {self.default_ttl_minutes} minutes")
+        
+    @property
+    def default_ttl_minutes(self) -> int:
+        return self._ttl_override or get_config().SESSION_TTL_MINUTES
+    
+    def set_ttl_override(self, minutes: Optional[int]):
+        """Set a bank-specific TTL for new sessions (None follows SESSION_TTL_MINUTES)"""
+        self._ttl_override = minutes
+    
+    def _audit(self, event: str, session: Session, **fields):
+        """Record a lifecycle event in the audit log, if enabled"""
+        if self._audit_log is not None:
+            self._audit_log.record(event, session.session_id, session.psn, session.request_id,
+                                   bank=self._bank_id, **fields)
+    
+    def _bucket(self, created_at: datetime) -> int:
+        return int(created_at.timestamp() // self._bucket_seconds)
+    
+    def _index_add(self, session: Session):
+        buckets = self._status_index[session.status]
+        buckets.setdefault(self._bucket(session.created_at), set()).add(session.session_id)
+        self._status_counts[session.status] += 1
+    
+    def _index_remove(self, session: Session):
+        buckets = self._status_index[session.status]
+        bucket = self._bucket(session.created_at)
+        members = buckets.get(bucket)
+        if members is not None and session.session_id in members:
+            members.discard(session.session_id)
+            if not members:
+                del buckets[bucket]
+            self._status_counts[session.status] -= 1
+    
+    def _set_status(self, session: Session, status: SessionStatus):
+        """Change a session's status, keeping the secondary indexes in step (caller holds the lock)"""
+        if session.status == status:
+            return
+        self._index_remove(session)
+        session.status = status
+        self._index_add(session)
+    
+    def create_session(self, psn: str, request_id: Optional[str] = None,
+                       on_superseded: Optional[Callable[[str], None]] = None) -> Session:
         """
         Create a new session for a PSN.
         Only one valid session per PSN is allowed.
+        request_id is the X-Request-ID of the creating request, kept for the audit log.
+        on_superseded(session_id) is called for a still-PENDING session this one replaces,
+        so its consent process can be stopped.
         """
+        superseded_pending = None
         with self._lock:
             # Expire any existing session for this PSN
             if psn in self._psn_sessions:
                 old_session_id = self._psn_sessions[psn]
-                if old_session_id in self._sessions:
-                    self._sessions[old_session_id].status = SessionStatus.EXPIRED
+                old_session = self._sessions.get(old_session_id)
+                if old_session is not None:
+                    if old_session.status == SessionStatus.PENDING:
+                        superseded_pending = old_session_id
+                    if old_session.status != SessionStatus.EXPIRED:
+                        self._audit(EVENT_SUPERSEDED, old_session, superseded_by_request_id=request_id)
+                        get_expiry_scheduler().cancel(self._expiry_key(old_session_id))
+                    self._set_status(old_session, SessionStatus.EXPIRED)
+                    self._dirty.add(old_session_id)
                     logger.info(f"Expired previous session {old_session_id} for PSN {psn}")
             
             # Create new session. Normalize to upper case for consistency
             session_id = generate_uuid().upper()
-            expires_at = datetime.now() + timedelta(minutes=self._default_ttl_minutes)
+            if self._node_tag:
+                session_id = tag_session_id(session_id, self._node_tag)
+            now = self._clock.now()
+            expires_at = now + timedelta(minutes=self.default_ttl_minutes)
 
             session = Session(
                 session_id=session_id,
                 psn=psn,
                 status=SessionStatus.PENDING,
-                created_at=datetime.now(),
-                expires_at=expires_at
+                created_at=now,
+                expires_at=expires_at,
+                request_id=request_id
             )
             
             self._sessions[session_id] = session
             self._psn_sessions[psn] = session_id
+            self._dirty.add(session_id)
+            self._index_add(session)
+            self._audit(EVENT_CREATED, session)
             
             logger.info(f"Created new session {session_id} for PSN {psn}")
-            return session
+        
+        if superseded_pending and on_superseded:
+            on_superseded(superseded_pending)
+        self._schedule_expiry(session)
+        return session
+    
+    def _expiry_key(self, session_id: str) -> str:
+        return f"expire:{self._bank_id}:{session_id}"
+    
+    def _schedule_expiry(self, session: Session):
+        """Expire the session at expires_at even if nobody reads it again, so the EXPIRED event is recorded"""
+        if session.expires_at is None:
+            return
+        session_id = session.session_id
+        get_expiry_scheduler().schedule(
+            session.expires_at.timestamp() - self._clock.time(),
+            lambda: self._expire_if_due(session_id),
+            key=self._expiry_key(session_id)
+        )
+    
+    def _expire_if_due(self, session_id: str):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.status == SessionStatus.EXPIRED:
+                return
+            if session.expires_at and self._clock.now() >= session.expires_at:
+                self._audit(SessionStatus.EXPIRED.value, session)
+                self._set_status(session, SessionStatus.EXPIRED)
+                self._dirty.add(session_id)
+                logger.info(f"Session {session_id} has expired")
     
     def get_session(self, session_id: str) -> Optional[Session]:
         """Get a session by ID"""
@@ -66,19 +170,31 @@ class SessionManager:
             logger.debug(f"Retrieved session: {session}")
             if session:
                 # Check if session has expired
-                if session.expires_at and datetime.now() > session.expires_at:
-                    session.status = SessionStatus.EXPIRED
+                if session.expires_at and self._clock.now() > session.expires_at:
+                    if session.status != SessionStatus.EXPIRED:
+                        self._dirty.add(session.session_id)
+                        self._audit(SessionStatus.EXPIRED.value, session)
+                    self._set_status(session, SessionStatus.EXPIRED)
                     logger.info(f"Session {session_id} has expired")
             return session
     
     def update_session_status(self, session_id: str, status: SessionStatus, data: Optional[BankData] = None) -> bool:
-        """Update session status and optionally set data"""
+        """
+        Update session status and optionally set data.
+        An EXPIRED session stays expired: a late consent result for a superseded or timed-out session is refused.
+        """
         with self._lock:
             if session_id in self._sessions:
                 session = self._sessions[session_id.upper()]
-                session.status = status
+                if session.status == SessionStatus.EXPIRED and status != SessionStatus.EXPIRED:
+                    logger.info(f"Ignoring {status.value} for expired session {session_id}")
+                    return False
+                if session.status != status:
+                    self._audit(status.value, session)
+                self._set_status(session, status)
                 if data:
                     session.data = data
+                self._dirty.add(session.session_id)
                 logger.info(f"Updated session {session_id} status to {status.value}")
                 return True
             return False
@@ -93,7 +209,7 @@ class SessionManager:
     def cleanup_expired_sessions(self):
         """Remove expired sessions from memory"""
         with self._lock:
-            current_time = datetime.now()
+            current_time = self._clock.now()
             expired_sessions = []
             
             for session_id, session in self._sessions.items():
@@ -103,11 +219,185 @@ class SessionManager:
             
             for session_id in expired_sessions:
                 session = self._sessions.pop(session_id, None)
+                if session:
+                    self._index_remove(session)
+                if session and session.status != SessionStatus.EXPIRED:
+                    self._audit(SessionStatus.EXPIRED.value, session)
                 if session and session.psn in self._psn_sessions:
                     if self._psn_sessions[session.psn] == session_id:
                         del self._psn_sessions[session.psn]
+                self._dirty.discard(session_id)
+                self._removed.add(session_id)
                 logger.info(f"Cleaned up expired session {session_id}")
 
+    
+    def drain_changes(self, full: bool = False) -> Tuple[List[tuple], List[str]]:
+        """
+        Collect snapshot records for sessions changed since the last call.
+        With full=True every live session is returned. Returns (records, removed session IDs).
+        """
+        with self._lock:
+            if full:
+                records = [_session_to_record(session) for session in self._sessions.values()]
+                removed = []
+            else:
+                records = [_session_to_record(self._sessions[session_id])
+                           for session_id in self._dirty if session_id in self._sessions]
+                removed = list(self._removed)
+            self._dirty.clear()
+            self._removed.clear()
+            return records, removed
+    
+    def restore_sessions(self, records: List[tuple]) -> List[Session]:
+        """
+        Load sessions from snapshot records, dropping any that have already expired.
+        Returns the restored sessions.
+        """
+        now = self._clock.now()
+        restored = []
+        with self._lock:
+            for record in records:
+                session = _session_from_record(record)
+                if session.status == SessionStatus.EXPIRED or \
+                   (session.expires_at and now > session.expires_at):
+                    continue
+                previous = self._sessions.get(session.session_id)
+                if previous is not None:
+                    self._index_remove(previous)
+                self._sessions[session.session_id] = session
+                self._index_add(session)
+                current_id = self._psn_sessions.get(session.psn)
+                current = self._sessions.get(current_id) if current_id else None
+                if current is None or current.created_at <= session.created_at:
+                    self._psn_sessions[session.psn] = session.session_id
+                restored.append(session)
+        for session in restored:
+            self._schedule_expiry(session)
+        logger.info(f"Restored {len(restored)} of {len(records)} sessions from snapshot")
+        return restored
+    
+    def status_counts(self) -> Dict[str, int]:
+        """
+        Number of sessions per status, read from the maintained counters.
+        Sessions move to EXPIRED when their expiry timer fires, so the counts follow the TTL without reads.
+        """
+        with self._lock:
+            counts = {status.value: count for status, count in self._status_counts.items()}
+        counts['total'] = sum(counts.values())
+        return counts
+    
+    def count_created(self, created_after: Optional[datetime] = None,
+                      created_before: Optional[datetime] = None,
+                      status: Optional[SessionStatus] = None) -> int:
+        """
+        Count sessions created in [created_after, created_before).
+        Whole buckets inside the range are counted by size; only the two edge buckets are scanned.
+        """
+        low = created_after.timestamp() if created_after else None
+        high = created_before.timestamp() if created_before else None
+        first = int(low // self._bucket_seconds) if low is not None else None
+        last = int(high // self._bucket_seconds) if high is not None else None
+        statuses = [status] if status else list(SessionStatus)
+        count = 0
+        with self._lock:
+            for s in statuses:
+                for bucket, members in self._status_index[s].items():
+                    if (first is not None and bucket < first) or (last is not None and bucket > last):
+                        continue
+                    if bucket == first or bucket == last:
+                        count += sum(1 for session_id in members
+                                     if _in_range(self._sessions[session_id].created_at.timestamp(), low, high))
+                    else:
+                        count += len(members)
+        return count
+    
+    def list_sessions(self, status: Optional[SessionStatus] = None, created_after: Optional[datetime] = None,
+                      created_before: Optional[datetime] = None, cursor: Optional[str] = None,
+                      limit: int = 100) -> Tuple[List[Session], Optional[str]]:
+        """
+        List sessions in creation order, optionally filtered by status and creation time range.
+        Returns one page and the cursor for the next page (None on the last page).
+        Only the buckets from the cursor onwards are visited, so deep pages stay cheap.
+        Raises ValueError for a malformed cursor.
+        """
+        after = _parse_cursor(cursor) if cursor else None
+        low = created_after.timestamp() if created_after else None
+        high = created_before.timestamp() if created_before else None
+        start = max(low if low is not None else float('-inf'), after[0] if after else float('-inf'))
+        statuses = [status] if status else list(SessionStatus)
+        
+        page: List[Session] = []
+        with self._lock:
+            bucket_keys = sorted({bucket for s in statuses for bucket in self._status_index[s]})
+            if start != float('-inf'):
+                bucket_keys = bucket_keys[bisect.bisect_left(bucket_keys, int(start // self._bucket_seconds)):]
+            for bucket in bucket_keys:
+                if high is not None and bucket * self._bucket_seconds >= high:
+                    break
+                members = [self._sessions[session_id]
+                           for s in statuses for session_id in self._status_index[s].get(bucket, ())]
+                for session in sorted(members, key=_order_key):
+                    key = _order_key(session)
+                    if after is not None and key <= after:
+                        continue
+                    if not _in_range(key[0], low, high):
+                        continue
+                    page.append(session)
+                    if len(page) > limit:
+                        return page[:limit], _format_cursor(_order_key(page[limit - 1]))
+        return page, None
+
+
+def _order_key(session: Session) -> Tuple[float, str]:
+    """Listing order: creation time (microsecond precision), then session ID"""
+    return round(session.created_at.timestamp(), 6), session.session_id
+
+
+def _format_cursor(key: Tuple[float, str]) -> str:
+    return f"{key[0]:.6f}_{key[1]}"
+
+
+def _parse_cursor(cursor: str) -> Tuple[float, str]:
+    timestamp, _, session_id = cursor.partition('_')
+    if not session_id:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return float(timestamp), session_id
+
+
+def _in_range(timestamp: float, low: Optional[float], high: Optional[float]) -> bool:
+    return (low is None or timestamp >= low) and (high is None or timestamp < high)
+
+
+def _session_to_record(session: Session) -> tuple:
+    """Pack a session into a compact tuple for snapshots"""
+    data = None
+    if session.data:
+        data = (session.data.DepositInterest, session.data.DebtSecurityInterest,
+                session.data.SecuritiesDeductable, session.data.NonPersonifiedIncome)
+    return (
+        session.session_id,
+        session.psn,
+        session.status.value,
+        session.created_at.timestamp(),
+        session.expires_at.timestamp() if session.expires_at else None,
+        data,
+        session.request_id
+    )
+
+
+def _session_from_record(record: tuple) -> Session:
+    """Rebuild a session from a snapshot record"""
+    session_id, psn, status, created_at, expires_at, data = record[:6]
+    return Session(
+        session_id=session_id,
+        psn=psn,
+        status=SessionStatus(status),
+        created_at=datetime.fromtimestamp(created_at),
+        expires_at=datetime.fromtimestamp(expires_at) if expires_at is not None else None,
+        data=BankData(*data) if data else None,
+        request_id=record[6] if len(record) > 6 else None  # Older snapshots have no request ID
+    )
+
 
-# Global session manager instance
-session_manager = SessionManager()
\ No newline at end of file
+# Global session manager instance, created on first use
+get_session_manager = LazySingleton(SessionManager)
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""
+Snapshot service for the Bank Data API
+Periodically persists session and rate-limit state so a restarted server can resume in-flight sessions
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.models import SessionStatus
+from app.config import get_logger, get_config, LazySingleton
+from app.services.bank_registry import get_bank_registry
+import atexit
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+
+logger = get_logger('services.snapshot')
+
+# Snapshot files are a sequence of frames: 4-byte big-endian length + zlib-compressed pickle.
+# The first frame is a full snapshot, the following ones are deltas applied in order.
+# Version 2 frames hold sessions per bank.
+_FRAME_HEADER = struct.Struct('>I')
+_FORMAT_VERSION = 2
+
+
+class SnapshotService:
+    """Writes incremental snapshots of every bank's session store off the request path"""
+
+    def __init__(self, registry_source: Callable[[], Any], path: Optional[str], interval_seconds: float = 5.0,
+                 compact_every: int = 50):
+        """
+        Initialize the snapshot service; nothing is written until start() is called.
+        registry_source returns the current bank registry, which a hot reload may replace.
+        """
+        self._registry = registry_source
+        self._path = path
+        self._interval = interval_seconds
+        self._compact_every = compact_every
+        self._deltas_since_full = 0
+        self._force_full = False  # Set when a write fails: the changes it drained are only in memory now
+        self._written_sources: Optional[Dict[str, Any]] = None  # Source state in the last frame written
+        self._sources: Dict[str, Tuple[Callable[[], Any], Callable[[Any], None]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._path)
+
+    def register_source(self, name: str, export: Callable[[], Any], restore: Callable[[Any], None]):
+        """Include additional state (e.g. rate limits) in every snapshot frame"""
+        self._sources[name] = (export, restore)
+
+    def start(self):
+        """Start the background snapshot thread"""
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='session-snapshot', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        logger.info(f"Snapshotting sessions to {self._path} every {self._interval} seconds")
+
+    def stop(self):
+        """Stop the background thread and write a final snapshot"""
+        self._stop.set()
+        if self.enabled:
+            self.write_snapshot()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self.write_snapshot()
+            except Exception as e:
+                logger.error(f"Failed to write session snapshot: {e}")
+
+    def write_snapshot(self, full: bool = False) -> int:
+        """
+        Append a delta frame with changes since the last snapshot (sessions or registered sources such as
+        rate limits), or rewrite the file with a full frame once enough deltas have accumulated.
+        Returns bytes written.
+        """
+        with self._lock:
+            full = (full or self._force_full or self._deltas_since_full >= self._compact_every
+                    or not os.path.exists(self._path))
+            # Draining clears the sessions' change sets; if the write below fails, the next write must be full
+            self._force_full = True
+            banks = {}
+            for bank_id, bank in self._registry().banks().items():
+                records, removed = bank.session_manager.drain_changes(full=full)
+                if full or records or removed:
+                    banks[bank_id] = {'sessions': records, 'removed': removed}
+            sources = {name: export() for name, (export, _) in self._sources.items()}
+            if not full and not banks and sources == self._written_sources:
+                self._force_full = False
+                return 0
+
+            frame = {
+                'version': _FORMAT_VERSION,
+                'full': full,
+                'written_at': time.time(),
+                'banks': banks,
+                'sources': sources
+            }
+            payload = zlib.compress(pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL))
+            data = _FRAME_HEADER.pack(len(payload)) + payload
+
+            if full:
+                tmp_path = f"{self._path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self._path)
+                self._deltas_since_full = 0
+                self._force_full = False
+                self._written_sources = sources
+            else:
+                with open(self._path, 'ab') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._deltas_since_full += 1
+                self._force_full = False
+                self._written_sources = sources
+
+            logger.debug(f"Wrote {'full' if full else 'delta'} snapshot: "
+                         f"{sum(len(b['sessions']) for b in banks.values())} sessions, "
+                         f"{sum(len(b['removed']) for b in banks.values())} removed, {len(data)} bytes")
+            return len(data)
+
+    def restore(self, on_pending: Optional[Callable] = None) -> int:
+        """
+        Restore sessions from the snapshot file, dropping expired ones.
+        on_pending(bank, session) is called for each restored PENDING session to re-arm its consent process.
+        Returns the number of sessions restored.
+        """
+        if not self.enabled or not os.path.exists(self._path):
+            return 0
+
+        started = time.perf_counter()
+        sessions: Dict[str, Dict[str, tuple]] = {}  # bank_id -> session_id -> record
+        sources: Dict[str, Any] = {}
+        frames = 0
+        try:
+            with open(self._path, 'rb') as f:
+                for frame in _read_frames(f):
+                    if frame.get('version') != _FORMAT_VERSION:
+                        logger.warning(f"Ignoring snapshot frame with unknown version {frame.get('version')}")
+                        continue
+                    if frame['full']:
+                        sessions.clear()
+                    for bank_id, changes in frame['banks'].items():
+                        bank_sessions = sessions.setdefault(bank_id, {})
+                        for session_id in changes['removed']:
+                            bank_sessions.pop(session_id, None)
+                        for record in changes['sessions']:
+                            bank_sessions[record[0]] = record
+                    sources.update(frame['sources'])
+                    frames += 1
+        except Exception as e:
+            logger.error(f"Failed to read session snapshot {self._path}: {e}")
+            return 0
+
+        restored_count = 0
+        for bank_id, bank_sessions in sessions.items():
+            bank = self._registry().get(bank_id)
+            if bank is None:
+                logger.warning(f"Dropping {len(bank_sessions)} snapshot sessions of unknown bank '{bank_id}'")
+                continue
+            restored = bank.session_manager.restore_sessions(list(bank_sessions.values()))
+            restored_count += len(restored)
+            if on_pending:
+                for session in restored:
+                    if session.status == SessionStatus.PENDING:
+                        on_pending(bank, session)
+
+        for name, state in sources.items():
+            if name in self._sources:
+                self._sources[name][1](state)
+
+        # Start the next run from a compacted file holding only the surviving sessions
+        self.write_snapshot(full=True)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Restored {restored_count} sessions from {frames} snapshot frames in {elapsed_ms:.1f} ms")
+        return restored_count
+
+
+def _read_frames(f):
+    """Yield decoded frames, stopping quietly at a truncated trailing frame"""
+    while True:
+        header = f.read(_FRAME_HEADER.size)
+        if len(header) < _FRAME_HEADER.size:
+            return
+        (length,) = _FRAME_HEADER.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length:
+            logger.warning("Ignoring truncated trailing snapshot frame")
+            return
+        yield pickle.loads(zlib.decompress(payload))
+
+
+def _create_snapshot_service() -> SnapshotService:
+    config = get_config()
+    return SnapshotService(
+        get_bank_registry,
+        config.SNAPSHOT_FILE,
+        interval_seconds=config.SNAPSHOT_INTERVAL_SECONDS,
+        compact_every=config.SNAPSHOT_COMPACT_EVERY
+    )
+
+
+# Global snapshot service instance, created on first use
+get_snapshot_service = LazySingleton(_create_snapshot_service)
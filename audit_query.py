@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Audit log query tool for the Bank Data API
+Prints session lifecycle events from the audit log segments, oldest first
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from app.services.audit_log import read_events
+
+
+def parse_time(value: str) -> float:
+    """Accept a Unix timestamp or an ISO 8601 date-time"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the Bank Data API session audit log")
+    parser.add_argument('--dir', default=os.environ.get('AUDIT_LOG_DIR'),
+                        help="audit log directory (default: $AUDIT_LOG_DIR)")
+    parser.add_argument('--session', help="session ID")
+    parser.add_argument('--psn', help="personal security number")
+    parser.add_argument('--request-id', help="X-Request-ID of the creating request")
+    parser.add_argument('--event', help="created, superseded, READY, DENIED or EXPIRED")
+    parser.add_argument('--since', type=parse_time, help="only events at or after this application clock time")
+    parser.add_argument('--until', type=parse_time, help="only events at or before this application clock time")
+    parser.add_argument('--count', action='store_true', help="print the number of matching events only")
+    args = parser.parse_args()
+
+    if not args.dir:
+        parser.error("no audit log directory, pass --dir or set AUDIT_LOG_DIR")
+
+    events = read_events(args.dir, session_id=args.session and args.session.upper(), psn=args.psn,
+                         request_id=args.request_id, event=args.event, since=args.since, until=args.until)
+
+    if args.count:
+        print(sum(1 for _ in events))
+        return
+
+    try:
+        for event in events:
+            print(json.dumps(event))
+    except BrokenPipeError:
+        sys.stderr.close()  # Output piped into head or similar
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Cluster throughput benchmark for the Bank Data API
+Starts run_cluster.py with increasing node counts and measures aggregate requests per second through the router
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+import http.client
+import urllib.request
+
+# Mix of PSNs with data (session created) and without (404), spread over the ring
+_KNOWN_PSNS = ['1234567890', '9876543210', '5555555555']
+
+
+def _client(port: int, duration: float, results):
+    """One keep-alive client issuing data requests until the duration has passed"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    count = errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        psn = random.choice(_KNOWN_PSNS) if random.random() < 0.2 else str(random.randrange(10**9, 10**10))
+        try:
+            conn.request('GET', f'/citizen/{psn}/BankingData')
+            response = conn.getresponse()
+            response.read()
+            count += 1
+            errors += response.status >= 500
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+    results.put((count, errors))
+
+
+def measure(port: int, clients: int, duration: float) -> dict:
+    """Run clients in separate processes and return the aggregate rate"""
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_client, args=(port, duration, results)) for _ in range(clients)]
+    for worker in workers:
+        worker.start()
+    totals = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    requests = sum(count for count, _ in totals)
+    return {'requests_per_second': requests / duration, 'errors': sum(errors for _, errors in totals)}
+
+
+def wait_until_up(url: str, timeout_seconds: float = 30.0) -> bool:
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def run_cluster(nodes: int, router_port: int, base_port: int, router_workers: int, clients: int,
+                duration: float) -> dict:
+    """Start a cluster of the given size, load it through the router and shut it down"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env.setdefault('LOG_LEVEL', 'ERROR')
+    env['RATE_LIMIT_MAX_REQUESTS'] = str(10**9)
+    cluster = subprocess.Popen(
+        [sys.executable, 'run_cluster.py', '-n', str(nodes), '--router-port', str(router_port),
+         '--base-port', str(base_port), '--router-workers', str(router_workers)],
+        cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if not wait_until_up(f'http://127.0.0.1:{router_port}/router/status'):
+            raise SystemExit(f"cluster with {nodes} nodes did not start")
+        measure(router_port, clients, 1.0)  # Warm up pools and connections
+        result = measure(router_port, clients, duration)
+    finally:
+        cluster.terminate()
+        cluster.wait()
+    result['nodes'] = nodes
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure router throughput for growing cluster sizes")
+    parser.add_argument('--nodes', default='1,2,4', help="comma-separated node counts (default: 1,2,4)")
+    parser.add_argument('-c', '--clients', type=int, default=16, help="client processes (default: 16)")
+    parser.add_argument('-d', '--duration', type=float, default=10.0, help="seconds per run (default: 10)")
+    parser.add_argument('--router-workers', type=int, default=os.cpu_count() // 2 or 1,
+                        help="router processes (default: half the CPUs)")
+    parser.add_argument('--router-port', type=int, default=8000)
+    parser.add_argument('--base-port', type=int, default=8081)
+    parser.add_argument('--json', action='store_true', help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    results = [run_cluster(int(n), args.router_port, args.base_port, args.router_workers, args.clients,
+                           args.duration) for n in args.nodes.split(',')]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    baseline = results[0]['requests_per_second']
+    print(f"Throughput through the router ({args.clients} clients, {args.router_workers} router workers, "
+          f"{os.cpu_count()} CPUs)")
+    for result in results:
+        print(f"  {result['nodes']:>2} nodes  {result['requests_per_second']:9.0f} req/s  "
+              f"x{result['requests_per_second'] / baseline:4.2f}  errors {result['errors']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the Bank Data API
+Measures import time, create_app() time and time to the first served request in fresh interpreters
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Runs inside a fresh interpreter so that nothing is cached between samples
+_PROBE = r"""
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+created = time.perf_counter()
+client = flask_app.test_client()
+response = client.get('/citizen/1234567890/BankingData')
+first_request = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (first_request - created) * 1000,
+    'total_ms': (first_request - started) * 1000,
+    'status': response.status_code
+}))
+"""
+
+
+def run_sample(env: dict) -> dict:
+    """Run one cold start and return its timings"""
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Bank Data API cold start time")
+    parser.add_argument('-n', '--samples', type=int, default=10, help="number of cold starts (default: 10)")
+    parser.add_argument('--json', action='store_true', help="print the raw samples as JSON")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('LOG_LEVEL', 'ERROR')
+    samples = [run_sample(env) for _ in range(args.samples)]
+
+    if args.json:
+        print(json.dumps(samples, indent=2))
+        return
+
+    print(f"Cold start over {args.samples} samples (median / min / max, ms)")
+    for key in ['import_ms', 'create_app_ms', 'first_request_ms', 'total_ms']:
+        values = [sample[key] for sample in samples]
+        print(f"  {key[:-3]:<15} {statistics.median(values):8.1f} {min(values):8.1f} {max(values):8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,12 +4,12 @@ Run this file to start the Bank Data API server
 """
 
 from app import create_app
-from app.config import Config, get_logger
+from app.config import get_config, get_logger
 import os
 
 if __name__ == '__main__':
     app = create_app()
-    config = Config()
+    config = get_config()
     logger = get_logger('main')
     
     logger.info("="*60)
@@ -28,6 +28,7 @@ if __name__ == '__main__':
     logger.info("  GET  /citizen/{PSN}/BankingData                 - Initiate data request")
     logger.info("  GET  /request/{sessionID}                       - Check session status")
     logger.info("  GET  /citizen/{PSN}/BankingData/{sessionID}     - Retrieve banking data")
+    logger.info("  GET  /banks/{bankID}/...                        - Same API for a bank from BANKS_CONFIG_FILE")
     logger.info("")
     logger.info("Example PSNs for testing:")
     logger.info("  1234567890 - Has banking data")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Local cluster launcher for the Bank Data API
+Starts several app instances on consecutive ports plus the router in front of them, all on this machine
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def wait_until_up(url: str, timeout_seconds: float = 15.0) -> bool:
+    """Poll url until it answers or the timeout passes"""
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run N Bank Data API nodes behind the cluster router")
+    parser.add_argument('-n', '--nodes', type=int, default=3, help="number of app instances (default: 3)")
+    parser.add_argument('--base-port', type=int, default=8081, help="port of the first node (default: 8081)")
+    parser.add_argument('--router-port', type=int, default=8000, help="router port (default: 8000)")
+    parser.add_argument('--router-workers', type=int, default=1, help="router processes (default: 1)")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env.setdefault('LOG_LEVEL', 'WARNING')
+    env['HOST'] = '127.0.0.1'
+    env['FLASK_DEBUG'] = 'false'  # The reloader would fork a second process per node
+
+    processes = []
+    backends = []
+    try:
+        for i in range(args.nodes):
+            name, port = f"node-{i + 1}", args.base_port + i
+            node_env = dict(env, NODE_ID=name, PORT=str(port))
+            # Keep per-node state files apart when snapshots or the audit log are enabled
+            if env.get('SNAPSHOT_FILE'):
+                node_env['SNAPSHOT_FILE'] = f"{env['SNAPSHOT_FILE']}.{name}"
+            if env.get('AUDIT_LOG_DIR'):
+                node_env['AUDIT_LOG_DIR'] = os.path.join(env['AUDIT_LOG_DIR'], name)
+            processes.append(subprocess.Popen([sys.executable, 'run.py'], cwd=root, env=node_env))
+            backends.append(f"{name}=http://127.0.0.1:{port}")
+
+        for i in range(args.nodes):
+            if not wait_until_up(f"http://127.0.0.1:{args.base_port + i}/health"):
+                raise SystemExit(f"node-{i + 1} did not start")
+
+        router_env = dict(env, ROUTER_BACKENDS=','.join(backends), ROUTER_PORT=str(args.router_port),
+                          ROUTER_WORKERS=str(args.router_workers))
+        processes.append(subprocess.Popen([sys.executable, 'run_router.py'], cwd=root, env=router_env))
+        if not wait_until_up(f"http://127.0.0.1:{args.router_port}/router/status"):
+            raise SystemExit("router did not start")
+
+        print(f"Cluster of {args.nodes} nodes behind http://127.0.0.1:{args.router_port} (Ctrl-C to stop)")
+        for backend in backends:
+            print(f"  {backend}")
+        while all(process.poll() is None for process in processes):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
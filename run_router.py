@@ -0,0 +1,59 @@
+"""
+Cluster router entry point
+Run this file to spread API traffic over the app instances listed in ROUTER_BACKENDS
+"""
+
+from app.config import get_config, get_logger, setup_logging
+from app.router import Router, create_server, parse_backends
+import multiprocessing
+
+
+def serve(reuse_port: bool):
+    """Run one router process until interrupted"""
+    config = get_config()
+    router = Router(
+        parse_backends(config.ROUTER_BACKENDS),
+        vnodes=config.ROUTER_VNODES,
+        pool_size=config.ROUTER_POOL_SIZE,
+        timeout_seconds=config.ROUTER_TIMEOUT_SECONDS,
+        health_path=config.ROUTER_HEALTH_PATH
+    )
+    router.start_health_checks(config.ROUTER_HEALTH_INTERVAL_SECONDS)
+    server = create_server(router, config.HOST, config.ROUTER_PORT, reuse_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        router.stop()
+
+
+if __name__ == '__main__':
+    setup_logging()
+    config = get_config()
+    logger = get_logger('main')
+
+    backends = parse_backends(config.ROUTER_BACKENDS)
+    logger.info("="*60)
+    logger.info("Bank Data API Router Starting")
+    logger.info("="*60)
+    logger.info(f"Listening on {config.HOST}:{config.ROUTER_PORT} with {config.ROUTER_WORKERS} worker process(es)")
+    for name, url in backends.items():
+        logger.info(f"  {name:<12} {url}")
+    logger.info("  GET  /router/status                             - Backend health and request counts")
+    logger.info("="*60)
+
+    if config.ROUTER_WORKERS <= 1:
+        serve(reuse_port=False)
+    else:
+        # Workers share the listening port through SO_REUSEPORT; the kernel spreads connections over them
+        workers = [multiprocessing.Process(target=serve, args=(True,), daemon=True)
+                   for _ in range(config.ROUTER_WORKERS)]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            pass